@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+
+
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "you know"}  # Disfluencies only; "well", "just" etc. carry meaning
+FILLER_PATTERN = re.compile(r"\b(" + "|".join(sorted((re.escape(w) for w in FILLER_WORDS), key=len, reverse=True)) + r")\b")
+# Drop punctuation except the symbols that tell languages apart (C++, C#, .NET, Node.js):
+# "+" and "#" after a word, "." inside or in front of one
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s+#.]|(?<![\w+#])[+#]|\.(?!\w)")
+
+
+def normalize_question(question):
+    """Fold case, punctuation and filler words so re-asked questions share a key."""
+    text = PUNCTUATION_PATTERN.sub(" ", question.lower())
+    text = FILLER_PATTERN.sub(" ", text)
+    return " ".join(text.split())
+
+
+def symbol_terms(text):
+    """Words of a normalized question that carry a symbol, e.g. {"c++"}; these must match exactly."""
+    return {word for word in text.split() if not word.replace("_", "").isalnum()}
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Character-trigram Jaccard similarity of two normalized questions."""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+
+class AnswerCache:
+    """LRU/TTL cache of answers keyed on normalized questions, persisted to an append-only JSONL file.
+
+    The file is loaded lazily on first use (or by calling `load` from a background
+    thread at startup) and compacted when it grows well beyond the live entries.
+    """
+
+    def __init__(self, path=None, max_entries=500, ttl=30 * 24 * 3600, similarity_threshold=0.9):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.entries = OrderedDict()  # (model, normalized question) -> entry dict
+        self.lock = threading.RLock()
+        self.loaded = path is None
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+
+    def load(self):
+        """Read the on-disk store once; later calls are no-ops."""
+        with self.lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            if not os.path.exists(self.path):
+                return
+            lines = 0
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        lines += 1
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # Torn write from a crash
+                        key = (entry["model"], entry["key"])
+                        self.entries.pop(key, None)
+                        self.entries[key] = entry
+            except OSError as e:
+                print(f"Error loading answer cache: {e}")
+                return
+            self.evict()
+            if lines > 2 * max(len(self.entries), 1):
+                self.compact()
+
+
+    def expired(self, entry, now):
+        return self.ttl is not None and now - entry["created"] > self.ttl
+
+
+    def evict(self):
+        now = time.time()
+        for key in [k for k, entry in self.entries.items() if self.expired(entry, now)]:
+            del self.entries[key]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+    def get(self, question, model=""):
+        """Return a cached answer for the question (or a near-identical one), or None."""
+        key = (model, normalize_question(question))
+        now = time.time()
+        with self.lock:
+            self.load()
+            entry = self.entries.get(key)
+            if entry is not None and not self.expired(entry, now):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry["answer"]
+
+            if self.similarity_threshold is not None and key[1]:
+                best, best_score = None, self.similarity_threshold
+                symbols = symbol_terms(key[1])
+                for other_key, other in self.entries.items():
+                    if other_key[0] != model or self.expired(other, now):
+                        continue
+                    if symbol_terms(other_key[1]) != symbols:
+                        continue  # C++ vs C# is a different question, however similar the rest
+                    score = similarity(key[1], other_key[1])
+                    if score >= best_score:
+                        best, best_score = other_key, score
+                if best is not None:
+                    self.entries.move_to_end(best)
+                    self.similar_hits += 1
+                    return self.entries[best]["answer"]
+
+            self.misses += 1
+            return None
+
+
+    def put(self, question, answer, model=""):
+        key = normalize_question(question)
+        if not key:
+            return
+        entry = {"model": model, "key": key, "question": question, "answer": answer, "created": time.time()}
+        with self.lock:
+            self.load()
+            self.entries.pop((model, key), None)
+            self.entries[(model, key)] = entry
+            self.evict()
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"Error saving answer cache: {e}")
+
+
+    def compact(self):
+        """Rewrite the store with only the live entries."""
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error compacting answer cache: {e}")
+
+
+    def stats(self):
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+        }
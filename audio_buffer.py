@@ -0,0 +1,83 @@
+class AudioRingBuffer:
+    """Fixed-capacity PCM ring buffer that hands out zero-copy views of the current segment.
+
+    Every write lands twice, at its position and one capacity further on, so any
+    window no longer than the capacity is contiguous in memory and can be returned
+    as a memoryview without copying. Views stay valid until the ring wraps over them.
+    """
+
+    def __init__(self, capacity, frame_width=2):
+        self.frame_width = frame_width
+        self.capacity = capacity - capacity % frame_width
+        self.buffer = bytearray(2 * self.capacity)
+        self.view = memoryview(self.buffer)
+        self.written = 0  # Total bytes written since creation
+        self.segment_start = None
+        self.segment_end = None
+
+
+    def write(self, data):
+        """Append PCM data, overwriting the oldest audio once the ring is full."""
+        data = memoryview(data).cast("B")
+        if len(data) > self.capacity:
+            self.written += len(data) - self.capacity
+            data = data[-self.capacity:]
+
+        position = self.written % self.capacity
+        first = min(len(data), self.capacity - position)
+        rest = len(data) - first
+        self.view[position:position + first] = data[:first]
+        self.view[position + self.capacity:position + self.capacity + first] = data[:first]
+        if rest:
+            self.view[:rest] = data[first:]
+            self.view[self.capacity:self.capacity + rest] = data[first:]
+        self.written += len(data)
+
+        # Never let an open segment point at audio that has been overwritten
+        if self.segment_start is not None and self.written - self.segment_start > self.capacity:
+            self.segment_start = self.written - self.capacity
+            self.segment_end = max(self.segment_end, self.segment_start)
+
+
+    def open_segment(self, offset, pre_roll=0):
+        """Start a segment at absolute byte `offset`, reaching back `pre_roll` bytes so onsets aren't clipped."""
+        offset -= offset % self.frame_width
+        pre_roll -= pre_roll % self.frame_width
+        self.segment_start = max(offset - pre_roll, self.written - self.capacity, 0)
+        self.segment_end = max(min(offset, self.written), self.segment_start)
+
+
+    def extend_segment(self, offset=None):
+        """Move the end of the open segment to absolute byte `offset` (default: everything written)."""
+        if self.segment_start is None:
+            return
+        if offset is None:
+            offset = self.written
+        offset -= offset % self.frame_width
+        self.segment_end = max(min(offset, self.written), self.segment_start)
+
+
+    def segment(self):
+        """Zero-copy view of the current segment (pre-roll up to the last speech)."""
+        if self.segment_start is None:
+            return self.view[:0]
+        start = self.segment_start % self.capacity
+        return self.view[start:start + self.segment_end - self.segment_start]
+
+
+    def segment_length(self):
+        if self.segment_start is None:
+            return 0
+        return self.segment_end - self.segment_start
+
+
+    def clear_segment(self):
+        self.segment_start = None
+        self.segment_end = None
+
+
+    def tail(self, length):
+        """Zero-copy view of the most recent `length` bytes."""
+        length = min(length, self.written, self.capacity)
+        start = (self.written - length) % self.capacity
+        return self.view[start:start + length]
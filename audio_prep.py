@@ -0,0 +1,145 @@
+import io
+import threading
+import numpy as np
+
+
+
+SOUNDFILE_FORMATS = {
+    "FLAC": ("FLAC", "PCM_16"),
+    "OGG_OPUS": ("OGG", "OPUS"),
+}
+
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+
+class AudioPreparer:
+    """Turn captured PCM into a compact mono upload for speech recognition, entirely in memory.
+
+    Interleaved int16 audio at the capture rate is downmixed to mono, low-pass filtered
+    and resampled to `target_rate`, optionally peak-normalized, and encoded as FLAC or
+    Ogg/Opus (via soundfile) into a per-thread buffer that is reused between calls.
+    `encoding` and `sample_rate` describe the result and feed RecognitionConfig; without
+    soundfile the preparer falls back to LINEAR16 at the target rate.
+    """
+
+    def __init__(self, source_rate, source_channels, target_rate=16000, encoding="FLAC", normalize=False, headroom_db=1.0):
+        self.source_rate = source_rate
+        self.source_channels = source_channels
+        self.sample_rate = min(target_rate, source_rate)  # Never upsample
+        self.channels = 1
+        self.normalize = normalize
+        self.peak = 32767 * 10 ** (-headroom_db / 20)
+        self.ratio = source_rate / self.sample_rate
+        self.filter = self.lowpass_filter(self.ratio) if self.ratio > 1 else None
+        self.encoding = self.check_encoding(encoding)
+        self.buffers = threading.local()
+        self.lock = threading.Lock()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+    def check_encoding(self, encoding):
+        if encoding == "LINEAR16":
+            return encoding
+        if encoding not in SOUNDFILE_FORMATS:
+            raise ValueError(f"Unsupported upload encoding: {encoding}")
+        if encoding == "OGG_OPUS" and self.sample_rate not in OPUS_SAMPLE_RATES:
+            print(f"Opus does not support {self.sample_rate} Hz, using FLAC")
+            encoding = "FLAC"
+        try:
+            import soundfile
+        except ImportError:
+            print(f"soundfile is not installed, uploading LINEAR16 instead of {encoding}")
+            return "LINEAR16"
+        container, subtype = SOUNDFILE_FORMATS[encoding]
+        if subtype not in soundfile.available_subtypes(container):
+            print(f"libsndfile {soundfile.__libsndfile_version__} cannot write {encoding}, using FLAC")
+            encoding = "FLAC"
+        self.soundfile = soundfile
+        return encoding
+
+
+    @staticmethod
+    def lowpass_filter(ratio, zero_crossings=8):
+        """Blackman-windowed sinc anti-aliasing filter for decimating by `ratio`."""
+        cutoff = 0.5 / ratio  # Target Nyquist, in cycles per source sample
+        half = int(np.ceil(zero_crossings * ratio))
+        n = np.arange(-half, half + 1)
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(len(n))
+        return (taps / taps.sum()).astype(np.float32)
+
+
+    def downmix(self, pcm):
+        """Average the interleaved channels of int16 PCM into float32 mono."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        samples = samples[:len(samples) - len(samples) % self.source_channels]
+        if self.source_channels == 1:
+            return samples.astype(np.float32)
+        return samples.reshape(-1, self.source_channels).mean(axis=1, dtype=np.float32)
+
+
+    def resample(self, samples):
+        if self.filter is None or len(samples) == 0:
+            return samples
+        samples = np.convolve(samples, self.filter, mode="same")
+        if self.ratio.is_integer():
+            return samples[::int(self.ratio)]
+        positions = np.arange(int(len(samples) / self.ratio)) * self.ratio
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+    def apply_gain(self, samples):
+        """Peak-normalize to `headroom_db` below full scale (like pydub.effects.normalize)."""
+        peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+        if peak < 1.0:
+            return samples
+        return samples * (self.peak / peak)
+
+
+    def encode(self, samples):
+        """Encode mono int16 samples from `convert` in the upload format."""
+        if self.encoding == "LINEAR16":
+            content = samples.tobytes()
+        else:
+            content = self.encode_soundfile(samples)
+        with self.lock:
+            self.bytes_out += len(content)
+        return content
+
+
+    def encode_soundfile(self, samples):
+        buffer = getattr(self.buffers, "buffer", None)
+        if buffer is None:
+            buffer = self.buffers.buffer = io.BytesIO()
+        buffer.seek(0)
+        buffer.truncate()
+        container, subtype = SOUNDFILE_FORMATS[self.encoding]
+        self.soundfile.write(buffer, samples, self.sample_rate, format=container, subtype=subtype)
+        return buffer.getvalue()
+
+
+    def convert(self, pcm):
+        """Downmix, resample and normalize captured PCM (bytes or a memoryview) to mono int16 at `sample_rate`."""
+        samples = self.resample(self.downmix(pcm))
+        if self.normalize:
+            samples = self.apply_gain(samples)
+        with self.lock:
+            self.bytes_in += len(pcm)
+        return np.clip(np.round(samples), -32768, 32767).astype(np.int16)
+
+
+    def prepare(self, pcm):
+        """Return the encoded upload for a block of captured PCM."""
+        return self.encode(self.convert(pcm))
+
+
+    def stats(self):
+        with self.lock:
+            return {
+                "encoding": self.encoding,
+                "sample_rate": self.sample_rate,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "compression": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+            }
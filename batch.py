@@ -0,0 +1,242 @@
+"""Headless batch mode: transcribe and answer a directory of recorded interviews.
+
+Recordings are spread over a process pool; each worker segments a file with the live
+pipeline's VAD settings and runs a bounded number of concurrent STT and LLM requests.
+Results go to one JSONL file per recording (segment, timestamp, question, answer) and
+finished recordings get a .done marker, so an interrupted run resumes where it stopped.
+
+    python batch.py recordings/ --output answers/ --workers 4 --concurrency 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from google.cloud import speech
+from pydub import AudioSegment
+from config import config
+from main import InterviewAssistant, RATE, CHANNELS, CHUNK, MOCK_ANSWER
+from llm import OpenAIChatClient, FakeStreamingClient
+from transcription import FakeSpeechClient
+from answer_cache import AnswerCache
+from audio_prep import AudioPreparer
+from hedging import HedgedCaller
+
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm")
+FRAME_WIDTH = 2 * CHANNELS
+BYTES_PER_SECOND = RATE * FRAME_WIDTH
+
+worker = None  # BatchWorker of the current process, created by init_worker
+
+
+
+def load_pcm(path):
+    """Decode a recording to 16-bit PCM at the configured RATE/CHANNELS."""
+    audio = AudioSegment.from_file(path)
+    return audio.set_frame_rate(RATE).set_channels(CHANNELS).set_sample_width(2).raw_data
+
+
+def split_utterances(pcm):
+    """Segment a whole recording with the same Segmenter as transcribe_meeting.
+
+    Yields (start_seconds, end_seconds, segment_bytes).
+    """
+    block_frames = max(1, int(RATE / CHUNK * InterviewAssistant.CAPTURING_INTERVAL))
+    block_size = block_frames * CHUNK * FRAME_WIDTH
+    segmenter = InterviewAssistant.create_segmenter(block_frames=block_frames)
+
+    def timed(end, segment):
+        return end - len(segment) / BYTES_PER_SECOND, end, bytes(segment)
+
+    for position in range(0, len(pcm), block_size):
+        for event, at, segment in segmenter.process(pcm[position:position + block_size]):
+            if event != "start" and len(segment) > 0:
+                yield timed(at, segment)
+
+    segment = segmenter.finish()
+    if segment is not None:
+        yield timed(len(pcm) / BYTES_PER_SECOND, segment)
+
+
+
+class BatchWorker:
+    """Per-process clients plus bounded STT/LLM concurrency for processing recordings."""
+
+    def __init__(self, fake=False, stt_concurrency=4, llm_concurrency=4):
+        if fake:
+            self.speech_client = FakeSpeechClient([f"Batch question number {i}" for i in range(1, 100001)])
+            self.llm_client = FakeStreamingClient(MOCK_ANSWER, first_token_delay=0.0, token_delay=0.0)
+        else:
+            self.speech_client = speech.SpeechClient.from_service_account_json(config['google_service_account_key'])
+            self.llm_client = FakeStreamingClient(MOCK_ANSWER) if InterviewAssistant.USE_MOCK_ANSWERS else OpenAIChatClient(api_key=config['api_key_openai'])
+        self.answer_cache = None
+        if InterviewAssistant.ANSWER_CACHE and not fake:
+            self.answer_cache = AnswerCache(
+                InterviewAssistant.ANSWER_CACHE_PATH, InterviewAssistant.ANSWER_CACHE_SIZE,
+                ttl=InterviewAssistant.ANSWER_CACHE_TTL, similarity_threshold=InterviewAssistant.ANSWER_CACHE_SIMILARITY
+            )
+        self.audio_preparer = AudioPreparer(
+            RATE, CHANNELS, InterviewAssistant.UPLOAD_SAMPLE_RATE, InterviewAssistant.UPLOAD_ENCODING,
+            normalize=InterviewAssistant.UPLOAD_NORMALIZE
+        )
+        self.stt_slots = threading.Semaphore(stt_concurrency)
+        # Same deadline, timeout and retries as the live pipeline; no hedging, batch runs for throughput
+        self.stt_requests = HedgedCaller(
+            "stt", ("google", self.recognize), deadline=InterviewAssistant.STT_DEADLINE,
+            timeout=InterviewAssistant.REQUEST_TIMEOUT, retries=InterviewAssistant.REQUEST_RETRIES, hedge=False,
+            max_workers=stt_concurrency
+        )
+        self.llm_slots = threading.Semaphore(llm_concurrency)
+        self.executor = ThreadPoolExecutor(max(stt_concurrency, llm_concurrency))
+
+
+    def recognize(self, content):
+        preparer = self.audio_preparer
+        with self.stt_slots:
+            response = self.speech_client.recognize(
+                config=InterviewAssistant.build_recognition_config(preparer.encoding, preparer.sample_rate, preparer.channels),
+                audio=speech.RecognitionAudio(content=content),
+                timeout=InterviewAssistant.REQUEST_TIMEOUT
+            )
+        return " ".join(result.alternatives[0].transcript for result in response.results).strip()
+
+
+    def transcribe(self, segment):
+        content = self.audio_preparer.prepare(segment)
+        deadline = InterviewAssistant.STT_DEADLINE + InterviewAssistant.STT_DEADLINE_PER_SECOND * len(segment) / BYTES_PER_SECOND
+        return self.stt_requests.call(content, deadline=deadline).value
+
+
+    def answer(self, question):
+        if self.answer_cache:
+            cached = self.answer_cache.get(question, self.llm_client.model)
+            if cached is not None:
+                return cached
+        with self.llm_slots:
+            answer = self.llm_client.complete(question)
+        if self.answer_cache:
+            self.answer_cache.put(question, answer, self.llm_client.model)
+        return answer
+
+
+    def process_segment(self, index, start, end, segment):
+        question = self.transcribe(segment)
+        answer = self.answer(question) if question else None
+        return {"segment": index, "timestamp": round(start, 3), "end": round(end, 3), "question": question, "answer": answer}
+
+
+    def process_file(self, path, output_dir):
+        """Transcribe and answer one recording, skipping segments already in its output file."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        output_path = os.path.join(output_dir, f"{name}.jsonl")
+        done_path = os.path.join(output_dir, f"{name}.done")
+        if os.path.exists(done_path):
+            with open(done_path, "r", encoding="utf-8") as f:
+                return dict(json.load(f), skipped=True)
+
+        completed = set()
+        if os.path.exists(output_path):
+            with open(output_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        completed.add(json.loads(line)["segment"])
+                    except (ValueError, KeyError):
+                        continue  # Torn line from an interrupted run
+
+        started = time.time()
+        pcm = load_pcm(path)
+        audio_seconds = len(pcm) / BYTES_PER_SECOND
+        write_lock = threading.Lock()
+        segments = errors = 0
+        with open(output_path, "a", encoding="utf-8") as output:
+            futures = []
+            for index, (start, end, segment) in enumerate(split_utterances(pcm)):
+                segments += 1
+                if index not in completed:
+                    futures.append(self.executor.submit(self.process_segment, index, start, end, segment))
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception as e:
+                    print(f"{path}: segment failed: {e}")
+                    errors += 1
+                    continue
+                with write_lock:
+                    output.write(json.dumps(record) + "\n")
+                    output.flush()
+
+        stats = {
+            "file": path,
+            "audio_seconds": round(audio_seconds, 3),
+            "segments": segments,
+            "resumed_segments": len(completed),
+            "errors": errors,
+            "wall_seconds": round(time.time() - started, 3),
+        }
+        if errors == 0:
+            with open(done_path, "w", encoding="utf-8") as f:
+                json.dump(stats, f)
+        return stats
+
+
+
+def init_worker(fake, stt_concurrency, llm_concurrency):
+    global worker
+    worker = BatchWorker(fake, stt_concurrency, llm_concurrency)
+
+
+def process_file(path, output_dir):
+    return worker.process_file(path, output_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input_dir", help="Directory of recorded interviews")
+    parser.add_argument("--output", help="Output directory (default: <input_dir>/answers)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent STT requests per worker")
+    parser.add_argument("--llm-concurrency", type=int, help="Concurrent LLM requests per worker (default: --concurrency)")
+    parser.add_argument("--fake", action="store_true", help="Use local fake STT/LLM clients")
+    args = parser.parse_args(argv)
+
+    output_dir = args.output or os.path.join(args.input_dir, "answers")
+    os.makedirs(output_dir, exist_ok=True)
+    paths = sorted(
+        os.path.join(args.input_dir, name) for name in os.listdir(args.input_dir)
+        if name.lower().endswith(AUDIO_EXTENSIONS)
+    )
+    if not paths:
+        print(f"No recordings found in {args.input_dir}")
+        return 1
+
+    started = time.time()
+    audio_seconds = 0.0
+    failed = 0
+    initargs = (args.fake, args.concurrency, args.llm_concurrency or args.concurrency)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=initargs) as pool:
+        futures = {pool.submit(process_file, path, output_dir): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"{futures[future]}: failed: {e}")
+                failed += 1
+                continue
+            if stats.get("skipped"):
+                print(f"{stats['file']}: already processed, skipping")
+                continue
+            audio_seconds += stats["audio_seconds"]
+            print(f"{stats['file']}: {stats['segments']} segments ({stats['resumed_segments']} resumed), "
+                  f"{stats['errors']} errors, {stats['audio_seconds'] / 60:.1f} min of audio in {stats['wall_seconds']:.1f}s")
+
+    wall_seconds = time.time() - started
+    print(f"Processed {audio_seconds / 3600:.2f} audio hours in {wall_seconds / 3600:.3f} wall-clock hours: "
+          f"{audio_seconds / max(wall_seconds, 1e-9):.1f} audio-hours per wall-clock hour")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""Offline benchmark: replay recorded interviews through the InterviewAssistant pipeline.
+
+The input device is replaced by a WAV replay stream (real-time or accelerated) and the
+Speech-to-Text and OpenAI clients by local stubs with lognormal latency, so the capture ->
+segment -> transcribe -> answer pipeline runs headless. Results are written as JSON.
+
+    python benchmark.py recordings/*.wav --speed 1 --stt-latency 0.4,0.9 --llm-latency 0.6,1.5
+"""
+import sys
+import json
+import math
+import time
+import wave
+import random
+import argparse
+import threading
+import numpy as np
+from main import InterviewAssistant, RATE, CHANNELS, MOCK_ANSWER, ANSWER_STOPPED, ANSWER_ERROR
+from transcription import FakeSpeechClient
+from llm import FakeStreamingClient
+from tracing import Tracer
+
+
+
+class LatencyDistribution:
+    """Lognormal latency described by its median and 95th percentile, in seconds."""
+
+    def __init__(self, median, p95=None):
+        self.median = median
+        self.sigma = math.log(p95 / median) / 1.645 if p95 and median > 0 else 0.0
+
+
+    @classmethod
+    def parse(cls, text):
+        return cls(*[float(part) for part in text.split(",")])
+
+
+    def __call__(self):
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(random.gauss(0.0, self.sigma))
+
+
+    def describe(self):
+        return {"median": self.median, "p95": round(self.median * math.exp(1.645 * self.sigma), 3)}
+
+
+
+class ReplayStream:
+    """PyAudio-like input stream that paces a recording at `speed` times real time.
+
+    A reader that falls more than `buffer_frames` behind loses the oldest audio, as
+    PyAudio does with exception_on_overflow=False; those frames are counted in
+    `dropped_frames`. After the recording `tail` seconds of silence are played and
+    `finished` is set.
+    """
+
+    def __init__(self, data, rate, frame_width, speed=1.0, tail=2.0, buffer_frames=None):
+        self.data = data
+        self.rate = rate
+        self.frame_width = frame_width
+        self.speed = speed
+        self.total_frames = len(data) // frame_width + int(tail * rate)
+        self.buffer_frames = buffer_frames or rate  # About one second of device buffering
+        self.position = 0
+        self.dropped_frames = 0
+        self.started = None
+        self.finished = threading.Event()
+
+
+    def read(self, num_frames, exception_on_overflow=True):
+        if self.started is None:
+            self.started = time.time()
+        while True:
+            available = (time.time() - self.started) * self.rate * self.speed
+            if available - self.position > self.buffer_frames:
+                skipped = int(available - self.position - self.buffer_frames)
+                self.position += skipped
+                self.dropped_frames += skipped
+            if available >= self.position + num_frames:
+                break
+            time.sleep((self.position + num_frames - available) / (self.rate * self.speed))
+
+        start = self.position * self.frame_width
+        chunk = self.data[start:start + num_frames * self.frame_width]
+        chunk += b"\0" * (num_frames * self.frame_width - len(chunk))
+        self.position += num_frames
+        if self.position >= self.total_frames:
+            self.finished.set()
+        return chunk
+
+
+    def stop_stream(self):
+        pass
+
+
+    def close(self):
+        pass
+
+
+
+class ReplayAudio:
+    """Stand-in for pyaudio.PyAudio whose only input device replays a WAV file."""
+
+    def __init__(self, path, speed=1.0, tail=2.0):
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != CHANNELS or wav.getframerate() != RATE:
+                raise ValueError(
+                    f"{path}: expected 16-bit, {CHANNELS} channel, {RATE} Hz audio to match config, got "
+                    f"{8 * wav.getsampwidth()}-bit, {wav.getnchannels()} channel, {wav.getframerate()} Hz"
+                )
+            self.data = wav.readframes(wav.getnframes())
+        self.frame_width = 2 * CHANNELS
+        self.duration = len(self.data) / (self.frame_width * RATE)
+        self.speed = speed
+        self.tail = tail
+        self.stream = None
+        self.opened = threading.Event()
+
+
+    def get_sample_size(self, format):
+        return 2
+
+
+    def get_device_count(self):
+        return 1
+
+
+    def get_device_info_by_index(self, index):
+        return {"name": "CABLE Output / BlackHole (replay)"}
+
+
+    def open(self, **kwargs):
+        self.stream = ReplayStream(self.data, RATE, self.frame_width, self.speed, self.tail)
+        self.opened.set()
+        return self.stream
+
+
+
+class RecordingLLMClient(FakeStreamingClient):
+    """Fake LLM client that counts the streams in flight, so the benchmark knows when answering has drained."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.active = 0
+        self.lock = threading.Lock()
+
+
+    def stream(self, question, context=()):
+        with self.lock:
+            self.active += 1
+        try:
+            yield from super().stream(question, context)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+    def complete(self, question, context=()):
+        return "".join(self.stream(question, context))
+
+
+
+class FirstTokenTracer(Tracer):
+    """Disabled tracer that still timestamps the `first_token` stage, i.e. when an answer slot got its first token.
+
+    Hedge losers and abandoned speculations never reach an answer slot, so unlike
+    timing the LLM client's streams this only sees tokens the user was shown.
+    """
+
+    def __init__(self):
+        super().__init__(enabled=False)
+        self.first_tokens = {}  # Utterance id -> wall-clock time
+
+
+    def record(self, name, duration, utterance_id=None, start=None, export=True, **attrs):
+        if name == "first_token" and utterance_id is not None:
+            self.first_tokens.setdefault(utterance_id, time.time())
+
+
+
+class BenchmarkAssistant(InterviewAssistant):
+    """Headless InterviewAssistant that records when each transcript is committed and how each answer ended."""
+
+    ANSWER_CACHE = False
+    SESSION_JOURNAL = False
+
+    def __init__(self, *args, **kwargs):
+        self.transcripts = []  # (utterance id, speech_end, committed_at)
+        self.outcomes = {}  # Slot -> "completed", "cancelled", "errored" or "skipped"
+        super().__init__(*args, headless=True, **kwargs)
+        self.tracer = FirstTokenTracer()
+
+
+    def commit_question(self, transcription, utterance=None):
+        if transcription and transcription.strip() and utterance is not None:
+            self.transcripts.append((utterance.id, utterance.speech_end, time.time()))
+        super().commit_question(transcription, utterance)
+
+
+    def fill_answer(self, job, speculation=None):
+        super().fill_answer(job, speculation)
+        if job.superseded:
+            return  # The job that replaced it reports the slot
+        answer = self.answers[job.index]
+        if answer == ANSWER_ERROR:
+            self.outcomes[job.index] = "errored"
+        elif answer.endswith(ANSWER_STOPPED):
+            self.outcomes[job.index] = "cancelled"
+        else:
+            self.outcomes[job.index] = "completed"
+
+
+    def skip_answer(self, job):
+        super().skip_answer(job)
+        self.outcomes[job.index] = "skipped"
+
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 4),
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+    }
+
+
+def wait_until_idle(assistant, llm_client, timeout, settle=0.5):
+    """Wait until every stage has been empty and idle for `settle` seconds."""
+    deadline = time.time() + timeout
+    idle_since = None
+    while time.time() < deadline:
+        stats = assistant.pipeline_stats()
+        idle = (
+            stats["frames"]["depth"] == 0 and stats["segments"]["depth"] == 0 and stats["questions"]["depth"] == 0
+            and stats["transcribers"]["busy"] == 0 and stats["answerers"]["busy"] == 0 and llm_client.active == 0
+        )
+        if not idle:
+            idle_since = None
+        elif idle_since is None:
+            idle_since = time.time()
+        elif time.time() - idle_since >= settle:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def load_transcripts(path):
+    """Scripted transcripts from a .txt file next to the recording (one question per line), if present."""
+    try:
+        with open(path.rsplit(".", 1)[0] + ".txt", "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    except OSError:
+        return [f"Benchmark question number {i}" for i in range(1, 10001)]
+
+
+def run_recording(path, args):
+    audio = ReplayAudio(path, args.speed)
+    speech_client = FakeSpeechClient(load_transcripts(path), latency=LatencyDistribution.parse(args.stt_latency))
+    llm_client = RecordingLLMClient(
+        MOCK_ANSWER, first_token_delay=LatencyDistribution.parse(args.llm_latency), token_delay=args.token_delay
+    )
+    BenchmarkAssistant.STREAMING_RECOGNITION = not args.batch_stt
+    assistant = BenchmarkAssistant(
+        audio=audio, speech_client=speech_client, llm_client=llm_client, streaming_config_factory=FakeSpeechClient.streaming_config
+    )
+
+    cpu_start = time.process_time()
+    wall_start = time.time()
+    capture = threading.Thread(target=assistant.transcribe_meeting, daemon=True)
+    capture.start()
+    audio.opened.wait()
+    audio.stream.finished.wait()
+    assistant.stop_recording()
+    capture.join()
+    drained = wait_until_idle(assistant, llm_client, args.drain_timeout)
+    cpu_seconds = time.process_time() - cpu_start
+    wall_seconds = time.time() - wall_start
+
+    transcript_latency, first_token_latency, end_to_end_latency = [], [], []
+    for utterance_id, speech_end, committed_at in assistant.transcripts:
+        first_token = assistant.tracer.first_tokens.get(utterance_id)
+        if speech_end is not None:
+            transcript_latency.append(committed_at - speech_end)
+        if first_token is not None:
+            first_token_latency.append(first_token - committed_at)
+            if speech_end is not None:
+                end_to_end_latency.append(first_token - speech_end)
+    outcomes = list(assistant.outcomes.values())
+
+    stats = assistant.pipeline_stats()
+    return {
+        "file": path,
+        "audio_seconds": round(audio.duration, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "drained": drained,
+        "utterances": len(assistant.transcripts),
+        "answers": {outcome: outcomes.count(outcome) for outcome in ("completed", "cancelled", "errored", "skipped")},
+        "latency": {
+            "speech_end_to_transcript": percentiles(transcript_latency),
+            "transcript_to_first_token": percentiles(first_token_latency),
+            "end_to_end": percentiles(end_to_end_latency),
+        },
+        "dropped": {
+            "device_frames": audio.stream.dropped_frames,
+            "queued_frames": stats["frames"]["dropped"],
+            "segments": stats["segments"]["dropped"],
+            "merged_segments": stats["segments"]["merged"],
+            "questions": stats["questions"]["dropped"],
+        },
+        "startup": assistant.startup,
+        "cpu_seconds_per_audio_minute": round(cpu_seconds / max(audio.duration / 60, 1e-9), 4),
+        "pipeline": stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="+", help=f"WAV files ({RATE} Hz, {CHANNELS} channel, 16-bit)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed relative to real time")
+    parser.add_argument("--stt-latency", default="0.4,0.9", help="STT stub latency as median[,p95] seconds")
+    parser.add_argument("--llm-latency", default="0.6,1.5", help="LLM stub time to first token as median[,p95] seconds")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed LLM tokens")
+    parser.add_argument("--batch-stt", action="store_true", help="Use batch recognition instead of streaming")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="Seconds to wait for the pipeline to drain")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    runs = [run_recording(path, args) for path in args.recordings]
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "speed": args.speed,
+            "stt_latency": LatencyDistribution.parse(args.stt_latency).describe(),
+            "llm_latency": LatencyDistribution.parse(args.llm_latency).describe(),
+            "token_delay": args.token_delay,
+            "streaming_recognition": not args.batch_stt,
+            "vad_hangover": InterviewAssistant.VAD_HANGOVER_DURATION,
+        },
+        "runs": runs,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for run in runs:
+        end_to_end = run["latency"]["end_to_end"] or {}
+        print(f"{run['file']}: {run['utterances']} utterances, end-to-end p50={end_to_end.get('p50')}s "
+              f"p95={end_to_end.get('p95')}s, answers={run['answers']}, "
+              f"dropped frames={run['dropped']['device_frames'] + run['dropped']['queued_frames']}")
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
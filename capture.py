@@ -0,0 +1,187 @@
+import time
+import bisect
+import threading
+
+
+
+class DeviceNotFound(ValueError):
+    pass
+
+
+
+class DeviceCatalog:
+    """Cached input device enumeration shared by the capture streams, re-scanned on hotplug.
+
+    PortAudio only knows the devices present when it was initialized, so picking up a
+    plugged-in or re-attached device means re-initializing it through `create_audio`,
+    which invalidates every open stream. `request_rescan` therefore only marks the
+    catalog stale; each capture loop closes its own stream when it sees that, and the
+    last `open` to arrive after all streams are closed performs the rescan. Without
+    `create_audio` (an injected audio object) a rescan just re-reads the device list.
+    """
+
+    def __init__(self, audio, create_audio=None):
+        self.audio = audio
+        self.create_audio = create_audio
+        self.lock = threading.RLock()
+        self.devices = None  # [(index, info)] of input devices, filled on first use
+        self.open_streams = set()
+        self.stale = False
+        self.rescans = 0
+
+
+    def inputs(self):
+        with self.lock:
+            if self.devices is None:
+                devices = []
+                for index in range(self.audio.get_device_count()):
+                    info = self.audio.get_device_info_by_index(index)
+                    if info.get("maxInputChannels", 1) > 0:
+                        devices.append((index, info))
+                self.devices = devices
+            return self.devices
+
+
+    def find(self, name):
+        """(index, info) of the first input device whose name contains `name`, or None."""
+        for index, info in self.inputs():
+            if name in info.get("name", ""):
+                return index, info
+        return None
+
+
+    def open(self, name, **kwargs):
+        """Open an input stream on the device named `name`; returns (stream, device info).
+
+        Raises DeviceNotFound if no such device is attached, and returns (None, None)
+        while a rescan is waiting for other streams to close.
+        """
+        with self.lock:
+            if self.stale:
+                if self.open_streams:
+                    return None, None
+                self.rescan()
+            device = self.find(name)
+            if device is None:
+                raise DeviceNotFound(f"Device '{name}' not found")
+            index, info = device
+            stream = self.audio.open(input=True, input_device_index=index, **kwargs)
+            self.open_streams.add(stream)
+            return stream, info
+
+
+    def close(self, stream):
+        with self.lock:
+            self.open_streams.discard(stream)
+        try:
+            stream.stop_stream()
+            stream.close()
+        except OSError as e:
+            print(f"Error closing audio stream: {e}")
+
+
+    def request_rescan(self):
+        """Ask for a fresh device list, e.g. after a device stopped delivering audio."""
+        with self.lock:
+            self.stale = True
+
+
+    def rescan(self):
+        with self.lock:
+            if self.create_audio is not None:
+                self.audio.terminate()
+                self.audio = self.create_audio()
+            self.devices = None
+            self.stale = False
+            self.rescans += 1
+            print(f"Audio devices rescanned: {[info.get('name') for _, info in self.inputs()]}")
+
+
+
+class OwnVoiceMonitor:
+    """Per-chunk voice activity on the user's microphone, to tell their speech apart from the interviewer's.
+
+    The microphone runs through its own VoiceActivityDetector; `run` records, for each
+    captured chunk, its wall-clock capture time and whether the mic was in speech.
+    A loopback segment is "own voice" when the mic carried speech for at least
+    `dominance` of the segment's span, i.e. the loopback only picked up the user's
+    reply (mixed into the routing, or through the speakers into the interviewer's call).
+    """
+
+    def __init__(self, vad, dominance=0.6, history=600):
+        self.vad = vad
+        self.dominance = dominance
+        self.history = history  # Seconds of activity kept
+        self.times = []
+        self.speech = []
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.suppressed = 0
+        self.passed = 0
+
+
+    def run(self, frames, max_batch):
+        """Mic segmenter stage: classify captured mic chunks until the frame queue closes."""
+        while True:
+            batch = frames.get_batch(max_batch)
+            if not batch:
+                break
+            # One VAD pass per batch (its noise floor adapts per block), then map the events back onto chunks
+            in_speech = self.vad.in_speech
+            batch_start = self.vad.time
+            events = self.vad.process(b"".join(chunk for _, chunk in batch))
+            chunk_duration = (self.vad.time - batch_start) / len(batch)
+            states = []
+            for i, (captured_at, _) in enumerate(batch):
+                chunk_end = batch_start + (i + 1) * chunk_duration
+                while events and events[0][1] < chunk_end:
+                    in_speech = events.pop(0)[0] == "start"
+                states.append((captured_at, in_speech))
+            with self.lock:
+                for captured_at, in_speech in states:
+                    self.times.append(captured_at)
+                    self.speech.append(in_speech)
+                expired = bisect.bisect_left(self.times, time.time() - self.history)
+                if expired > len(self.times) // 2:  # Trim in bulk to keep appends cheap
+                    del self.times[:expired]
+                    del self.speech[:expired]
+
+
+    def speaking(self, at, lag=0.1, stall=1.0):
+        """Whether the user is talking at wall-clock time `at`; None until the mic has been analysed up to then.
+
+        The mic is classified in batches, so its activity can trail the loopback by up
+        to one batch; callers should wait rather than guess. A mic that has delivered
+        nothing for `stall` seconds (e.g. unplugged) counts as silent.
+        """
+        with self.lock:
+            latest = self.times[-1] if self.times else self.started
+            if latest < at - lag:
+                return None if latest > at - stall else False
+            return self.speech[-1] if self.times[-1] <= at else self.speech[bisect.bisect_left(self.times, at)]
+
+
+    def share(self, start, end):
+        """Fraction of mic chunks captured between `start` and `end` that were speech, or None without mic audio."""
+        with self.lock:
+            first = bisect.bisect_left(self.times, start)
+            last = bisect.bisect_right(self.times, end)
+            if last <= first:
+                return None
+            return sum(self.speech[first:last]) / (last - first)
+
+
+    def is_own_voice(self, start, end):
+        share = self.share(start, end)
+        own = share is not None and share >= self.dominance
+        with self.lock:
+            if own:
+                self.suppressed += 1
+            else:
+                self.passed += 1
+        return own
+
+
+    def stats(self):
+        with self.lock:
+            return {"suppressed": self.suppressed, "passed": self.passed}
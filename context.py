@@ -0,0 +1,157 @@
+import re
+import bisect
+import threading
+
+
+# Words that point back at earlier turns ("how does it scale?", "why not those?")
+REFERRING_WORDS = {
+    "it", "its", "this", "that", "these", "those", "they", "them", "their", "he", "she", "him", "her",
+    "there", "then", "above", "previous", "earlier", "same", "else", "instead", "also", "more",
+}
+FOLLOW_UP_OPENINGS = ("and ", "but ", "so ", "or ", "what about", "how about", "why not", "can you elaborate", "tell me more")
+WORD_PATTERN = re.compile(r"[\w'+#.]+")
+
+
+def is_follow_up(question, min_words=4):
+    """Whether `question` probably depends on the conversation, i.e. is not understandable on its own.
+
+    Short questions, questions opening like a continuation and questions that refer back
+    ("it", "that", "those", ...) count as follow-ups.
+    """
+    text = question.lower().strip()
+    words = [word.strip(".") for word in WORD_PATTERN.findall(text)]
+    if len(words) < min_words or text.startswith(FOLLOW_UP_OPENINGS):
+        return True
+    return any(word.split("'")[0] in REFERRING_WORDS for word in words)
+
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) used when tiktoken is unavailable."""
+    return len(text) // 4 + 1
+
+
+def make_token_counter(model):
+    """Exact token counter for `model` via tiktoken if installed, else the estimate."""
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception:
+        return estimate_tokens
+    return lambda text: len(encoding.encode(text))
+
+
+
+class ConversationContext:
+    """Token-budgeted interview history to send along with each question.
+
+    Recent Q/A turns are kept verbatim. Once they exceed `token_budget`, the oldest
+    are folded into a running summary of at most `summary_tokens` by
+    `summarize(summary, [(question, answer), ...], summary_tokens)` on a background
+    thread, until the window is back to half the budget. Folding many turns at once keeps the prompt prefix (system prompt, summary, older turns) identical
+    across consecutive questions so provider-side prompt caching can hit. While a fold
+    is in flight the window may run over budget; `messages` never sends more than
+    twice the budget of turns.
+    """
+
+    def __init__(self, summarize, token_budget=1500, summary_tokens=300, count_tokens=estimate_tokens):
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.count_tokens = count_tokens
+        self.turns = []  # (index, question, answer, tokens), sorted by answer slot
+        self.summary = ""
+        self.summarized_through = -1  # Highest slot folded into the summary
+        self.summarizing = False
+        self.folds = 0
+        self.last_prompt_tokens = 0
+        self.lock = threading.Lock()
+
+
+    def add_turn(self, index, question, answer):
+        """Record a finished answer; may start a background fold of the oldest turns."""
+        tokens = self.count_tokens(question) + self.count_tokens(answer)
+        with self.lock:
+            if index <= self.summarized_through:
+                return  # Regenerated answer to a question that is already summarized
+            position = bisect.bisect_left([turn[0] for turn in self.turns], index)
+            if position < len(self.turns) and self.turns[position][0] == index:
+                self.turns[position] = (index, question, answer, tokens)
+            else:
+                self.turns.insert(position, (index, question, answer, tokens))
+            fold = self.pick_fold()
+        if fold:
+            threading.Thread(target=self.fold, args=(fold,), daemon=True).start()
+
+
+    def window_tokens(self):
+        return sum(turn[3] for turn in self.turns)
+
+
+    def pick_fold(self):
+        """Choose the oldest turns to summarize (caller holds the lock); keeps at least the newest turn."""
+        if self.summarizing or self.window_tokens() <= self.token_budget:
+            return None
+        remaining = self.window_tokens()
+        fold = []
+        for turn in self.turns[:-1]:
+            if remaining <= self.token_budget // 2:
+                break
+            fold.append(turn)
+            remaining -= turn[3]
+        if not fold:
+            return None
+        self.summarizing = True
+        return fold
+
+
+    def fold(self, turns):
+        """Merge `turns` into the summary (background thread), then drop them from the window."""
+        try:
+            summary = self.summarize(self.summary, [(question, answer) for _, question, answer, _ in turns], self.summary_tokens)
+        except Exception as e:
+            print(f"Context summary failed: {e}")
+            summary = None
+
+        folded = {turn[0] for turn in turns}
+        with self.lock:
+            self.summarizing = False
+            if summary is None:
+                return  # Retried on the next turn
+            self.summary = summary.strip()
+            self.summarized_through = max(self.summarized_through, max(folded))
+            self.turns = [turn for turn in self.turns if turn[0] not in folded]
+            self.folds += 1
+            fold = self.pick_fold()
+        if fold:
+            self.fold(fold)
+
+
+    def messages(self, before_index=None):
+        """Chat messages carrying the context for the question in slot `before_index` (default: a new question)."""
+        with self.lock:
+            summary = self.summary
+            turns = [turn for turn in self.turns if before_index is None or turn[0] < before_index]
+        while len(turns) > 1 and sum(turn[3] for turn in turns) > 2 * self.token_budget:
+            turns.pop(0)  # The summary is lagging behind; keep the prompt bounded anyway
+
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the interview so far: {summary}"})
+        for _, question, answer, _ in turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        self.last_prompt_tokens = sum(self.count_tokens(message["content"]) for message in messages)
+        return messages
+
+
+    def stats(self):
+        with self.lock:
+            return {
+                "turns": len(self.turns),
+                "window_tokens": self.window_tokens(),
+                "summary_tokens": self.count_tokens(self.summary) if self.summary else 0,
+                "summarized_through": self.summarized_through,
+                "folds": self.folds,
+                "last_prompt_tokens": self.last_prompt_tokens,
+            }
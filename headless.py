@@ -0,0 +1,52 @@
+class HeadlessRoot:
+    """Stand-in for tk.Tk when running without a window; scheduled callbacks run immediately."""
+
+    def after(self, ms, func=None, *args):
+        if func is not None:
+            func(*args)
+
+
+    def after_idle(self, func, *args):
+        func(*args)
+
+
+    def mainloop(self):
+        pass
+
+
+
+class HeadlessUI:
+    """No-op replacement for InterviewAssistantUI."""
+
+    overlay_visible = False
+
+    def show_interim(self, text):
+        pass
+
+
+    def show_status(self, text, ready=False):
+        pass
+
+
+    def update_questions_and_answers(self, questions, answers):
+        pass
+
+
+    def set_answer(self, item_id, answer):
+        pass
+
+
+    def start_at(self, item_id):
+        pass
+
+
+    def highlight_answer(self, selected_index, answers):
+        pass
+
+
+    def ensure_answer_visibility(self):
+        pass
+
+
+    def scroll_to_end(self):
+        pass
@@ -0,0 +1,245 @@
+import time
+import queue
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+
+class HedgedResult:
+    """Outcome of a hedged request: the value and which backend produced it, how fast."""
+
+    def __init__(self, value, backend, duration, attempts, hedged):
+        self.value = value
+        self.backend = backend
+        self.duration = duration
+        self.attempts = attempts
+        self.hedged = hedged
+
+
+
+class HedgedStream:
+    """Token stream from whichever backend produced the first token; iterate it like the backend's own stream."""
+
+    def __init__(self, result):
+        first, self.iterator = result.value
+        self.first = first
+        self.backend = result.backend
+        self.duration = result.duration  # Time to first token
+        self.attempts = result.attempts
+        self.hedged = result.hedged
+
+
+    def __iter__(self):
+        if self.first is not None:
+            yield self.first
+        yield from self.iterator
+
+
+    def close(self):
+        close = getattr(self.iterator, "close", None)
+        if close:
+            close()
+
+
+
+class HedgedCaller:
+    """Deadline-aware requests to a remote backend with jittered retries, hedging and a local fallback.
+
+    `primary` and `fallback` are (name, function) pairs. A call starts on the primary;
+    if no result has arrived once the primary's recent p95 latency has passed, a second
+    (hedged) request is fired and the first result wins. Failures are retried after a
+    random backoff up to `retries` times. When the `deadline` passes, or the primary has
+    failed for good, the fallback is started and raced against any remote requests
+    still in flight. Without a fallback the miss is only counted and the remote requests
+    are awaited up to `timeout`, after which DeadlineExceeded is raised. Losing requests
+    are left to finish (or time out) in the background.
+    """
+
+    def __init__(self, name, primary, fallback=None, deadline=5.0, timeout=30.0, retries=1, backoff=0.25, hedge=True,
+                 min_hedge_delay=0.3, min_samples=5, window=100, max_workers=8):
+        self.name = name
+        self.primary = primary
+        self.fallback = fallback
+        self.deadline = deadline
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix=f"{name}-request")
+        self.latencies = deque(maxlen=window)  # Successful primary latencies, for the hedge delay
+        self.lock = threading.Lock()
+        self.wins = {}
+        self.win_latencies = {}
+        self.hedges = 0
+        self.retried = 0
+        self.deadline_misses = 0
+        self.failures = 0
+
+
+    def hedge_delay(self):
+        """Recent p95 latency of the primary, or half the deadline until enough samples exist."""
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < self.min_samples:
+            return max(self.min_hedge_delay, self.deadline / 2)
+        return max(self.min_hedge_delay, samples[min(len(samples) - 1, int(len(samples) * 0.95))])
+
+
+    def call(self, *args, deadline=None):
+        """Return a HedgedResult for `function(*args)` from the first backend to succeed.
+
+        `deadline` overrides the configured one for this call, e.g. for a longer upload.
+        """
+        return self.run(lambda function: function(*args), deadline=deadline)
+
+
+    def stream(self, *args):
+        """Return a HedgedStream for the generator `function(*args)`; the deadline applies to the first token."""
+        return HedgedStream(self.run(lambda function: self.first_token(function(*args)), discard=self.discard_stream))
+
+
+    @staticmethod
+    def first_token(tokens):
+        iterator = iter(tokens)
+        try:
+            return next(iterator), iterator
+        except StopIteration:
+            return None, iterator
+
+
+    @staticmethod
+    def discard_stream(value):
+        close = getattr(value[1], "close", None)
+        if close:
+            close()
+
+
+    def run(self, attempt, discard=None, deadline=None):
+        started = time.monotonic()
+        scale = deadline / self.deadline if deadline else 1.0  # Longer requests hedge later too
+        deadline = started + (deadline or self.deadline)
+        give_up = started + max(self.timeout, deadline - started)
+        deadline_missed = False
+        results = queue.Queue()
+        futures = []
+        in_flight = 0
+        attempts = 0
+        primary_failures = 0
+        hedged = False
+        fallback_started = False
+        last_error = None
+
+        def launch(backend):
+            nonlocal in_flight, attempts
+            in_flight += 1
+            attempts += 1
+            launched = time.monotonic()
+            future = self.executor.submit(attempt, backend[1])
+            future.add_done_callback(lambda done: results.put((backend, launched, done)))
+            futures.append(future)
+
+        def start_fallback():
+            nonlocal fallback_started
+            fallback_started = True
+            launch(self.fallback)
+
+        launch(self.primary)
+        hedge_at = started + self.hedge_delay() * scale if self.hedge else None
+        if hedge_at is not None and hedge_at >= deadline:
+            hedge_at = None
+        retry_at = None
+
+        while True:
+            waiting_for = give_up if deadline_missed else deadline
+            timers = [t for t in (hedge_at, retry_at, None if fallback_started else waiting_for) if t is not None]
+            timeout = max(0.0, min(timers) - time.monotonic()) if timers else None
+            try:
+                backend, launched, future = results.get(timeout=timeout)
+            except queue.Empty:
+                now = time.monotonic()
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    hedged = True
+                    with self.lock:
+                        self.hedges += 1
+                    launch(self.primary)
+                if retry_at is not None and now >= retry_at:
+                    retry_at = None
+                    launch(self.primary)
+                if not fallback_started and not deadline_missed and now >= deadline:
+                    deadline_missed = True
+                    with self.lock:
+                        self.deadline_misses += 1
+                    if self.fallback is None:
+                        print(f"{self.name}: {self.primary[0]} missed the {deadline - started:.1f}s deadline, still waiting")
+                    else:
+                        print(f"{self.name}: {self.primary[0]} missed the {deadline - started:.1f}s deadline, using {self.fallback[0]}")
+                        start_fallback()
+                elif self.fallback is None and deadline_missed and now >= give_up:
+                    raise DeadlineExceeded(f"{self.name}: no result within {give_up - started:.1f}s")
+                continue
+
+            in_flight -= 1
+            error = future.exception()
+            if error is None:
+                return self.finish(future, futures, backend, launched, started, attempts, hedged, discard)
+
+            last_error = error
+            with self.lock:
+                self.failures += 1
+            print(f"{self.name}: {backend[0]} request failed: {error}")
+            if backend is self.primary:
+                primary_failures += 1
+                if primary_failures <= self.retries:
+                    with self.lock:
+                        self.retried += 1
+                    # Full jitter keeps retries from many questions from arriving in lockstep
+                    retry_at = time.monotonic() + random.uniform(0, self.backoff * 2 ** (primary_failures - 1))
+                    continue
+            if in_flight == 0 and retry_at is None:
+                if self.fallback is not None and not fallback_started:
+                    start_fallback()
+                else:
+                    raise last_error
+
+
+    def finish(self, future, futures, backend, launched, started, attempts, hedged, discard):
+        now = time.monotonic()
+        if discard:
+            for other in futures:
+                if other is not future:
+                    other.add_done_callback(lambda done: discard(done.result()) if done.exception() is None else None)
+        with self.lock:
+            if backend is self.primary:
+                self.latencies.append(now - launched)
+            self.wins[backend[0]] = self.wins.get(backend[0], 0) + 1
+            self.win_latencies.setdefault(backend[0], deque(maxlen=self.latencies.maxlen)).append(now - started)
+        return HedgedResult(future.result(), backend[0], now - started, attempts, hedged)
+
+
+    def stats(self):
+        with self.lock:
+            latency = {}
+            for backend, samples in self.win_latencies.items():
+                samples = sorted(samples)
+                latency[backend] = {
+                    "p50": round(samples[len(samples) // 2], 4),
+                    "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+                }
+            return {
+                "wins": dict(self.wins),
+                "latency": latency,
+                "hedges": self.hedges,
+                "retries": self.retried,
+                "deadline_misses": self.deadline_misses,
+                "failures": self.failures,
+            }
@@ -0,0 +1,163 @@
+import time
+import threading
+
+# openai 0.x sends every request through the module-global `openai.requestssession`, so the pooled
+# session is process-wide: created once and shared by all clients, each of which mounts its own
+# connection pool for its API base (see OpenAIChatClient.connect)
+SHARED_SESSION_LOCK = threading.Lock()
+
+
+
+class OpenAIChatClient:
+    """Answer questions with OpenAI chat completions, either in one piece or token by token.
+
+    openai is imported on first use, and every request goes through one pooled
+    HTTPS session so the connection opened by `warmup` is reused by later calls.
+    `api_base` points the client at any OpenAI-compatible server, e.g. a local
+    llama.cpp or Ollama instance used as the fallback backend.
+    """
+
+    def __init__(self, model="gpt-4", max_tokens=150, api_key=None, pool_size=4, summary_model=None,
+                 api_base=None, provider="openai", request_timeout=30):
+        self.model = model
+        self.summary_model = summary_model or model
+        self.max_tokens = max_tokens
+        self.api_key = api_key
+        self.api_base = api_base
+        self.provider = provider
+        self.request_timeout = request_timeout  # Bounds requests abandoned by the hedging layer
+        self.pool_size = pool_size
+        self.openai = None
+        self.lock = threading.Lock()
+
+
+    def connect(self):
+        """Import openai and mount this client's connection pool on the process-wide session (once).
+
+        Each client's pool is mounted on its own API base, so the remote and the local
+        backend keep `pool_size` warm connections each instead of replacing one another's.
+        """
+        with self.lock:
+            if self.openai is None:
+                import openai
+                import requests
+                with SHARED_SESSION_LOCK:
+                    if not isinstance(openai.requestssession, requests.Session):
+                        openai.requestssession = requests.Session()
+                    openai.requestssession.mount(
+                        self.api_base or openai.api_base,
+                        requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    )
+                self.openai = openai
+        return self.openai
+
+
+    def request_options(self):
+        options = {"request_timeout": self.request_timeout}
+        if self.api_key:
+            options["api_key"] = self.api_key
+        if self.api_base:
+            options["api_base"] = self.api_base
+        return options
+
+
+    def warmup(self):
+        """Open the HTTPS connection before the first question with a free model lookup."""
+        self.connect().Model.retrieve(self.model, **self.request_options())
+
+
+    def build_messages(self, question, context=()):
+        """System prompt, then earlier conversation (`context`), then the question; the prefix stays stable between calls."""
+        return [
+            {"role": "system", "content": "You are a helpful assistant."},
+            *context,
+            {"role": "user", "content": f"Answer the following question concisely: {question}"}
+        ]
+
+
+    def complete(self, question, context=()):
+        response = self.connect().ChatCompletion.create(
+            model=self.model,
+            messages=self.build_messages(question, context),
+            max_tokens=self.max_tokens,
+            **self.request_options()
+        )
+        return response.choices[0].message['content'].strip()
+
+
+    def summarize(self, summary, turns, max_tokens=300):
+        """Fold Q/A `turns` into the running interview `summary`."""
+        exchanges = "\n".join(f"Q: {question}\nA: {answer}" for question, answer in turns)
+        response = self.connect().ChatCompletion.create(
+            model=self.summary_model,
+            messages=[
+                {"role": "system", "content": "You keep a running summary of a job interview."},
+                {"role": "user", "content": (
+                    f"Summary so far:\n{summary or '(none)'}\n\nNew exchanges:\n{exchanges}\n\n"
+                    "Rewrite the summary to cover both. Keep the names, technologies, numbers and decisions "
+                    "that later questions may refer back to."
+                )}
+            ],
+            max_tokens=max_tokens,
+            **self.request_options()
+        )
+        return response.choices[0].message['content'].strip()
+
+
+    def stream(self, question, context=()):
+        """Yield pieces of the answer as the model produces them."""
+        response = self.connect().ChatCompletion.create(
+            model=self.model,
+            messages=self.build_messages(question, context),
+            max_tokens=self.max_tokens,
+            stream=True,
+            **self.request_options()
+        )
+        for chunk in response:
+            content = chunk.choices[0].delta.get('content')
+            if content:
+                yield content
+
+
+
+class FakeStreamingClient:
+    """Offline stand-in for OpenAIChatClient that streams a canned answer word by word.
+
+    `first_token_delay` may be a number of seconds or a callable returning one.
+    """
+
+    model = "mock"
+    provider = "mock"
+
+    def __init__(self, answer, first_token_delay=0.3, token_delay=0.02):
+        self.answer = answer
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+
+    def warmup(self):
+        pass
+
+
+    def wait_first_token(self):
+        time.sleep(self.first_token_delay() if callable(self.first_token_delay) else self.first_token_delay)
+
+
+    def complete(self, question, context=()):
+        self.wait_first_token()
+        time.sleep(self.token_delay * len(self.answer.split()))
+        return self.answer
+
+
+    def summarize(self, summary, turns, max_tokens=300):
+        self.wait_first_token()
+        words = (summary.split() + [word for question, _ in turns for word in question.split()])
+        return " ".join(words[-max_tokens:])
+
+
+    def stream(self, question, context=()):
+        self.wait_first_token()
+        for i, word in enumerate(self.answer.split(" ")):
+            if i:
+                time.sleep(self.token_delay)
+            yield word if i == 0 else f" {word}"
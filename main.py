@@ -1,47 +1,329 @@
-import os
-import io
 import time
-import openai
+STARTED_AT = time.perf_counter()  # Cold-start reference, taken before the remaining imports
+
+import os
 import pyaudio
 import platform
-import tempfile
 import threading
 import logging
-import numpy as np
 import tkinter as tk
-from google.cloud import speech
-from pydub import AudioSegment, effects
 from config import config
-from ui import InterviewAssistantUI
-
-openai.api_key = config['api_key_openai']
+from ui import InterviewAssistantUI, CoalescedUpdater
+from headless import HeadlessRoot, HeadlessUI
+from llm import OpenAIChatClient, FakeStreamingClient
+from answer_cache import AnswerCache
+from speculation import Speculator
+from transcription import StreamingSession, LocalWhisperTranscriber, create_speech_client, warm_up_speech_client
+from pipeline import StageQueue, WorkerPool, Utterance
+from scheduler import AnswerJob, AnswerQueue, ProviderLimits
+from context import ConversationContext, make_token_counter, is_follow_up
+from session_store import SessionStore
+from search_index import SearchIndex
+from tracing import Tracer
+from hedging import HedgedCaller
+from capture import DeviceCatalog, DeviceNotFound, OwnVoiceMonitor
 
 FORMAT = pyaudio.paInt16
 CHUNK = config['CHUNK']
 CHANNELS = config['CHANNELS']
 RATE = config['RATE'] # Match Voicemeeter's sample rate
 
-CUSTOM_TEMP_DIR = "C:\\custom_temp"
-os.makedirs(CUSTOM_TEMP_DIR, exist_ok=True)  # Ensure the directory exists
+MOCK_ANSWER = " ".join(["Mock answer"] * 129) + " ."
+ANSWER_SKIPPED = "Skipped: newer questions took priority."
+ANSWER_STOPPED = " [stopped: newer questions pending]"
+ANSWER_ERROR = "Error generating answer."
 
 
 
 class InterviewAssistant:
     SILENCE_THRESHOLD = config['SILENCE_THRESHOLD']
     CAPTURING_INTERVAL = config['CAPTURING_INTERVAL']
-    SILENCE_PAUSE_DURATION = config['SILENCE_PAUSE_DURATION']
+    PRE_ROLL_DURATION = config.get('PRE_ROLL_DURATION', 0.3)
+    MAX_SEGMENT_DURATION = config.get('MAX_SEGMENT_DURATION', 60)
+    VAD_ONSET_DURATION = config.get('VAD_ONSET_DURATION', 0.05)
+    VAD_HANGOVER_DURATION = config.get('VAD_HANGOVER_DURATION', 0.25)
+    STREAMING_RECOGNITION = config.get('STREAMING_RECOGNITION', True)
+    STREAMING_FINAL_TIMEOUT = config.get('STREAMING_FINAL_TIMEOUT', 5.0)
+    FRAME_QUEUE_DURATION = config.get('FRAME_QUEUE_DURATION', 10)
+    SEGMENT_QUEUE_SIZE = config.get('SEGMENT_QUEUE_SIZE', 4)
+    QUESTION_QUEUE_SIZE = config.get('QUESTION_QUEUE_SIZE', 4)
+    TRANSCRIPTION_WORKERS = config.get('TRANSCRIPTION_WORKERS', 2)
+    ANSWER_WORKERS = config.get('ANSWER_WORKERS', 2)
+    ANSWER_STALE_AFTER = config.get('ANSWER_STALE_AFTER', 3)
+    CONVERSATION_CONTEXT = config.get('CONVERSATION_CONTEXT', True)
+    CONTEXT_TOKEN_BUDGET = config.get('CONTEXT_TOKEN_BUDGET', 1500)
+    CONTEXT_SUMMARY_TOKENS = config.get('CONTEXT_SUMMARY_TOKENS', 300)
+    CONTEXT_FOLLOW_UPS_ONLY = config.get('CONTEXT_FOLLOW_UPS_ONLY', True)  # Standalone questions go without context and stay cacheable
+    STT_DEADLINE = config.get('STT_DEADLINE', 4.0)  # For a short question; grows with the segment length
+    STT_DEADLINE_PER_SECOND = config.get('STT_DEADLINE_PER_SECOND', 0.25)  # Extra deadline per second of audio
+    LLM_DEADLINE = config.get('LLM_DEADLINE', 6.0)  # Until the first answer token
+    REQUEST_RETRIES = config.get('REQUEST_RETRIES', 1)
+    HEDGE_REQUESTS = config.get('HEDGE_REQUESTS', True)
+    REQUEST_TIMEOUT = config.get('REQUEST_TIMEOUT', 30)
+    LOCAL_STT_MODEL = config.get('LOCAL_STT_MODEL', None)  # faster-whisper model size, e.g. "base.en"
+    LOCAL_LLM = config.get('LOCAL_LLM', None)  # e.g. {"model": "llama3", "api_base": "http://localhost:11434/v1"}
+    LLM_PROVIDER_LIMITS = config.get('LLM_PROVIDER_LIMITS', {"openai": {"concurrency": 2, "requests_per_minute": 60}})
+    USE_MOCK_ANSWERS = config.get('USE_MOCK_ANSWERS', True)
+    STREAM_ANSWERS = config.get('STREAM_ANSWERS', True)
+    UI_FRAME_INTERVAL_MS = config.get('UI_FRAME_INTERVAL_MS', 30)
+    ANSWER_CACHE = config.get('ANSWER_CACHE', True)
+    ANSWER_CACHE_PATH = config.get('ANSWER_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_cache.jsonl"))
+    ANSWER_CACHE_SIZE = config.get('ANSWER_CACHE_SIZE', 500)
+    ANSWER_CACHE_TTL = config.get('ANSWER_CACHE_TTL', 30 * 24 * 3600)
+    ANSWER_CACHE_SIMILARITY = config.get('ANSWER_CACHE_SIMILARITY', 0.9)
+    SPECULATIVE_ANSWERS = config.get('SPECULATIVE_ANSWERS', False)
+    SPECULATION_STABLE_DURATION = config.get('SPECULATION_STABLE_DURATION', 0.4)
+    SPECULATION_MATCH_THRESHOLD = config.get('SPECULATION_MATCH_THRESHOLD', 0.85)
+    TRACING = config.get('TRACING', False)
+    TRACE_PATH = config.get('TRACE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces.jsonl"))
+    TRACE_OVERLAY = config.get('TRACE_OVERLAY', True)
+    TRACE_OVERLAY_INTERVAL_MS = config.get('TRACE_OVERLAY_INTERVAL_MS', 500)
+    PREWARM_CLIENTS = config.get('PREWARM_CLIENTS', True)
+    UPLOAD_ENCODING = config.get('UPLOAD_ENCODING', 'FLAC')
+    UPLOAD_SAMPLE_RATE = config.get('UPLOAD_SAMPLE_RATE', 16000)
+    UPLOAD_NORMALIZE = config.get('UPLOAD_NORMALIZE', False)
+    SESSION_JOURNAL = config.get('SESSION_JOURNAL', True)
+    SESSION_DIR = config.get('SESSION_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions"))
+    SESSION_WINDOW = config.get('SESSION_WINDOW', 200)  # Q/A pairs kept in memory and on screen
+    SESSION_RESUME_WITHIN = config.get('SESSION_RESUME_WITHIN', 12 * 3600)  # Reopen a crashed session if used this recently
+    SEARCH_INDEX = config.get('SEARCH_INDEX', True)
+    SEARCH_RESULTS = config.get('SEARCH_RESULTS', 10)
+    LOOPBACK_DEVICE = config.get('LOOPBACK_DEVICE', None)  # Defaults to "CABLE Output" on Windows, "BlackHole" elsewhere
+    MIC_DEVICE = config.get('MIC_DEVICE', None)  # Name of your microphone; enables own-voice suppression
+    MIC_SILENCE_THRESHOLD = config.get('MIC_SILENCE_THRESHOLD', SILENCE_THRESHOLD)
+    OWN_VOICE_DOMINANCE = config.get('OWN_VOICE_DOMINANCE', 0.6)  # Share of a segment the mic must be in speech to drop it
+    CAPTURE_ERROR_LIMIT = config.get('CAPTURE_ERROR_LIMIT', 3)  # Consecutive read errors before rescanning devices
+    DEVICE_RETRY_INTERVAL = config.get('DEVICE_RETRY_INTERVAL', 2.0)
  
-    def __init__(self):
-        self.questions = []
-        self.answers = []
-        self.audio = pyaudio.PyAudio()
+    def __init__(self, audio=None, speech_client=None, llm_client=None, headless=False, streaming_config_factory=None):
+        """Build the assistant; pass fakes for audio/speech/LLM and headless=True to run without a window.
+
+        `streaming_config_factory()` returns the (streaming config, request builder) pair for
+        streaming recognition; pass FakeSpeechClient.streaming_config with a FakeSpeechClient.
+        """
+        self.streaming_config_factory = streaming_config_factory or self.build_streaming_config
+        self.session = None
+        if self.SESSION_JOURNAL:
+            self.session = SessionStore.open_latest(self.SESSION_DIR, self.SESSION_WINDOW, self.SESSION_RESUME_WITHIN)
+            self.questions = self.session.questions
+            self.answers = self.session.answers
+        else:
+            self.questions = []
+            self.answers = []
+        self.history_lock = threading.Lock()
+        self.audio = audio  # Created in the background by prepare_clients unless given
+        self.devices = None
         self.selected_index = None
-        self.root = tk.Tk()
-        self.ui = InterviewAssistantUI(self.root, self.on_question_select, self.start_recording)
+        if headless:
+            self.root = HeadlessRoot()
+            self.ui = HeadlessUI()
+        else:
+            self.root = tk.Tk()
+            self.ui = InterviewAssistantUI(
+                self.root, self.on_question_select, self.start_recording, self.regenerate_answer,
+                on_load_older=self.load_older, max_items=self.SESSION_WINDOW, on_search=self.search
+            )
+        self.answer_updates = CoalescedUpdater(self.root, self.render_answer, self.UI_FRAME_INTERVAL_MS)
         self.transcribing = False
-         # Google Cloud Speech client setup
-        self.speech_client = speech.SpeechClient.from_service_account_json(config['google_service_account_key'])
-        self.root.mainloop()
+        self.tracer = Tracer(self.TRACING, self.TRACE_PATH)
+        self.startup = {}  # Seconds from launch to window shown / clients ready / first answer
+        self.root.after_idle(self.on_window_shown)
+        # Google Cloud Speech client setup happens in prepare_clients, off the UI thread
+        self.speech_client = speech_client
+        self.audio_preparer = None
+        if llm_client is None:
+            if self.USE_MOCK_ANSWERS:
+                llm_client = FakeStreamingClient(MOCK_ANSWER)
+            else:
+                llm_client = OpenAIChatClient(
+                    api_key=config['api_key_openai'], pool_size=self.ANSWER_WORKERS + 1, request_timeout=self.REQUEST_TIMEOUT
+                )
+        self.llm_client = llm_client
+        self.local_llm_client = None
+        if self.LOCAL_LLM:
+            self.local_llm_client = OpenAIChatClient(
+                **dict({"provider": "local", "api_key": "local", "request_timeout": self.REQUEST_TIMEOUT}, **self.LOCAL_LLM)
+            )
+        self.local_transcriber = LocalWhisperTranscriber(self.LOCAL_STT_MODEL) if self.LOCAL_STT_MODEL else None
+        # Deadline/retry/hedging layer in front of the remote STT and LLM, with the local backends as fallback
+        self.stt_requests = HedgedCaller(
+            "stt", ("google", self.remote_transcribe),
+            ("whisper", self.local_transcribe) if self.local_transcriber else None,
+            deadline=self.STT_DEADLINE, timeout=self.REQUEST_TIMEOUT, retries=self.REQUEST_RETRIES, hedge=self.HEDGE_REQUESTS
+        )
+        self.answer_requests = HedgedCaller(
+            "llm", (self.llm_client.provider, self.remote_answer),
+            ("local", self.local_answer) if self.local_llm_client else None,
+            deadline=self.LLM_DEADLINE, timeout=self.REQUEST_TIMEOUT, retries=self.REQUEST_RETRIES, hedge=self.HEDGE_REQUESTS
+        )
+        self.clients_ready = threading.Event()
+        self.warmed_up = {}
+        self.answer_cache = None
+        if self.ANSWER_CACHE:
+            self.answer_cache = AnswerCache(
+                self.ANSWER_CACHE_PATH, self.ANSWER_CACHE_SIZE,
+                ttl=self.ANSWER_CACHE_TTL, similarity_threshold=self.ANSWER_CACHE_SIMILARITY
+            )
+            threading.Thread(target=self.answer_cache.load, daemon=True).start()  # Load off the UI thread
+        self.provider_limits = ProviderLimits(self.LLM_PROVIDER_LIMITS)
+        self.context = None
+        if self.CONVERSATION_CONTEXT:
+            self.context = ConversationContext(self.summarize_context, self.CONTEXT_TOKEN_BUDGET, self.CONTEXT_SUMMARY_TOKENS)
+        self.search_index = SearchIndex() if self.SEARCH_INDEX else None
+        self.latest_interim = ""
+        self.speculator = None
+        if self.SPECULATIVE_ANSWERS:
+            self.speculator = Speculator(
+                self.stream_answer,
+                match_threshold=self.SPECULATION_MATCH_THRESHOLD,
+                stable_duration=self.SPECULATION_STABLE_DURATION
+            )
+        threading.Thread(target=self.prepare_clients, daemon=True).start()
+
+        # capture -> segment -> transcribe -> answer pipeline
+        self.frame_queue = None
+        self.mic_queue = None
+        self.own_voice = None
+        self.segment_queue = StageQueue(
+            "segments", self.SEGMENT_QUEUE_SIZE, policy="merge",
+            merge=self.merge_segments, on_drop=self.release_segment
+        )
+        self.answer_queue = AnswerQueue(self.QUESTION_QUEUE_SIZE, stale_after=self.ANSWER_STALE_AFTER, on_cancel=self.skip_answer)
+        self.transcription_pool = WorkerPool("transcriber", self.segment_queue, self.transcribe_segment, self.TRANSCRIPTION_WORKERS).start()
+        self.answer_pool = WorkerPool("answerer", self.answer_queue, self.generate_answer, self.ANSWER_WORKERS).start()
+        if self.session is not None and len(self.session):
+            self.resume_session()
+        if self.TRACING and self.TRACE_OVERLAY and not headless:
+            self.root.after(self.TRACE_OVERLAY_INTERVAL_MS, self.refresh_overlay)
+        if not headless:
+            self.root.mainloop()
+            self.close()
+
+
+    def close(self):
+        """Shut down cleanly once the window is closed; a session that never gets here is resumed on the next start."""
+        self.stop_recording()
+        if self.session is not None:
+            self.session.close()
+
+
+    def resume_session(self):
+        """Show the reopened session's in-memory window, seed the conversation context from its latest answers
+        and answer again the questions whose answer was never journaled (e.g. still streaming at the crash)."""
+        print(f"Resuming session {self.session.path} with {len(self.session)} questions")
+        self.ui.start_at(self.session.window_start)
+        self.root.after(0, self.populate_questions_and_answers)
+        if self.context:
+            budget = self.CONTEXT_TOKEN_BUDGET
+            for index in range(len(self.session) - 1, self.session.window_start - 1, -1):
+                question, answer = self.session.get(index)
+                budget -= self.context.count_tokens(question) + self.context.count_tokens(answer)
+                if budget < 0:
+                    break
+                if answer:
+                    self.context.add_turn(index, question, answer)
+        for index in range(self.session.window_start, len(self.session)):
+            if not self.answers[index]:
+                self.answer_queue.put(AnswerJob(index, self.questions[index], use_speculation=False))
+        if self.search_index:
+            threading.Thread(target=self.index_session, daemon=True).start()
+
+
+    def index_session(self):
+        """Feed a reopened session's journal to the search index (background thread)."""
+        for record in self.session.records():
+            if "q" in record:
+                self.search_index.add(record["i"], "question", record["q"])
+            if "a" in record:
+                self.search_index.add(record["i"], "answer", record["a"])
+
+
+    def load_older(self, before, count):
+        """Page Q/A pairs older than slot `before` in from the session journal for the UI."""
+        if self.session is None:
+            return []
+        return self.session.page(before, count)
+
+
+    def save_answer(self, index):
+        """Journal and index the final text of an answer."""
+        if self.session is not None:
+            self.session.save_answer(index)
+        if self.search_index is not None:
+            self.search_index.add(index, "answer", self.answers[index])
+
+
+    def search(self, query):
+        """Ranked (slot, question) hits for the search bar."""
+        if self.search_index is None:
+            return []
+        return [(index, self.questions[index]) for index, _ in self.search_index.search(query, self.SEARCH_RESULTS)]
+
+
+    def on_window_shown(self):
+        """Runs once the first frame has been painted: the app is interactive from here."""
+        self.startup["window"] = time.perf_counter() - STARTED_AT
+        self.tracer.record("startup_window", self.startup["window"])
+        print(f"Window shown {self.startup['window']:.2f}s after launch")
+
+
+    def prepare_clients(self):
+        """Import heavy modules, build the audio/STT/LLM clients and open their connections off the UI thread."""
+        self.root.after(0, self.ui.show_status, "Connecting...")
+        try:
+            from audio_prep import AudioPreparer  # numpy
+            self.audio_preparer = AudioPreparer(
+                RATE, CHANNELS, self.UPLOAD_SAMPLE_RATE, self.UPLOAD_ENCODING, normalize=self.UPLOAD_NORMALIZE
+            )
+            if self.context:
+                self.context.count_tokens = make_token_counter(self.llm_client.model)
+            if self.audio is None:
+                self.audio = pyaudio.PyAudio()
+                self.devices = DeviceCatalog(self.audio, create_audio=pyaudio.PyAudio)
+            else:
+                self.devices = DeviceCatalog(self.audio)
+            self.devices.inputs()  # Enumerate once, off the UI thread; reused until a device goes away
+            if self.speech_client is None:
+                self.speech_client = create_speech_client(config['google_service_account_key'])
+        except Exception as e:
+            print(f"Client setup failed: {e}")
+            self.clients_ready.set()
+            self.root.after(0, self.ui.show_status, f"Setup failed: {e}")
+            return
+
+        status = "Ready"
+        if self.PREWARM_CLIENTS:
+            warmups = [
+                threading.Thread(target=self.warm_up, args=("Speech-to-Text", warm_up_speech_client, self.speech_client), daemon=True),
+                threading.Thread(target=self.warm_up, args=("LLM", self.llm_client.warmup), daemon=True),
+            ]
+            if self.local_transcriber:
+                warmups.append(threading.Thread(target=self.warm_up, args=("Local STT", self.local_transcriber.load), daemon=True))
+            for thread in warmups:
+                thread.start()
+            for thread in warmups:
+                thread.join()
+            failed = [name for name, ok in self.warmed_up.items() if not ok]
+            if failed:
+                status = f"Ready (cold: {', '.join(failed)})"
+
+        self.startup["clients_ready"] = time.perf_counter() - STARTED_AT
+        self.tracer.record("startup_clients_ready", self.startup["clients_ready"])
+        print(f"Clients ready {self.startup['clients_ready']:.2f}s after launch")
+        self.clients_ready.set()
+        self.root.after(0, self.ui.show_status, status, True)
+
+
+    def warm_up(self, name, warmup, *args):
+        """Run one client's warm-up call; a failure only means its first real request pays the setup cost."""
+        started = time.perf_counter()
+        try:
+            warmup(*args)
+            self.warmed_up[name] = True
+            print(f"{name} client warmed up in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            self.warmed_up[name] = False
+            print(f"{name} warm-up failed: {e}")
 
 
     def start_recording(self, start=True):
@@ -60,184 +342,597 @@ class InterviewAssistant:
  
  
     def transcribe_meeting(self):
+        """Capture stage: read interviewer (and microphone) frames into the frame queues until recording stops."""
         self.transcribing = True
+        if not self.clients_ready.is_set():
+            print("Waiting for clients to finish starting up...")
+            self.clients_ready.wait()
+
+        self.own_voice = None
+        self.mic_queue = None
+        if self.MIC_DEVICE:
+            self.start_microphone()  # Before the loopback, while a missing mic can still trigger a device rescan
+        loopback = self.loopback_device_name()
+        try:
+            stream = self.open_input(loopback, CHANNELS, RATE)
+        except (DeviceNotFound, OSError):
+            self.transcribing = False  # Stops the microphone capture as well
+            raise
+        print(f"Using device '{loopback}' for the interviewer")
 
-        stream = self.audio.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            input_device_index=self.get_device_index(),
-            frames_per_buffer=CHUNK
-        )
+        self.frame_queue = StageQueue("frames", int(RATE / CHUNK * self.FRAME_QUEUE_DURATION), policy="drop_oldest")
+        segmenter = threading.Thread(target=self.segment_audio, args=(self.frame_queue,), daemon=True)
+        segmenter.start()
 
-        audio_buffer = b""  # Accumulate audio data here
-        silence_start_time = None  # Track when silence starts
+        try:
+            self.capture_input(loopback, stream, self.frame_queue, CHANNELS, RATE)
+        finally:
+            print("Meeting transcription stopped.")
+            print(f"Pipeline stats: {self.pipeline_stats()}")
+            if self.audio_preparer:
+                print(f"Upload stats: {self.audio_preparer.stats()}")
+            if self.answer_cache:
+                print(f"Answer cache stats: {self.answer_cache.stats()}")
+            if self.speculator:
+                print(f"Speculation stats: {self.speculator.stats()}")
+            if self.context:
+                print(f"Context stats: {self.context.stats()}")
+            if self.session:
+                print(f"Session stats: {self.session.stats()}")
+            if self.own_voice:
+                print(f"Own voice stats: {self.own_voice.stats()}")
+
+
+    def loopback_device_name(self):
+        if self.LOOPBACK_DEVICE:
+            return self.LOOPBACK_DEVICE
+        return "CABLE Output" if platform.system() == "Windows" else "BlackHole"
+
+
+    def open_input(self, name, channels, rate):
+        """Open an input stream by device name, rescanning once if it is missing from the cached device list."""
+        options = dict(format=FORMAT, channels=channels, rate=rate, frames_per_buffer=CHUNK)
+        try:
+            stream, _ = self.devices.open(name, **options)
+        except DeviceNotFound:
+            print(f"Device '{name}' not found, rescanning devices...")
+            self.devices.request_rescan()
+            stream, _ = self.devices.open(name, **options)
+        return stream
 
+
+    def start_microphone(self):
+        """Capture the user's microphone next to the loopback and track when they are speaking."""
+        from vad import VoiceActivityDetector  # Imported lazily: pulls in numpy
+        try:
+            device = self.devices.find(self.MIC_DEVICE)
+            rate = int(device[1].get("defaultSampleRate", RATE)) if device else RATE
+            stream = self.open_input(self.MIC_DEVICE, 1, rate)
+        except (DeviceNotFound, OSError) as e:
+            print(f"Microphone unavailable, own-voice suppression is off: {e}")
+            return
+        print(f"Using device '{self.MIC_DEVICE}' for your voice")
+        vad = VoiceActivityDetector(
+            rate, 1, CHUNK, self.MIC_SILENCE_THRESHOLD,
+            onset_duration=self.VAD_ONSET_DURATION,
+            hangover_duration=self.VAD_HANGOVER_DURATION
+        )
+        self.own_voice = OwnVoiceMonitor(vad, self.OWN_VOICE_DOMINANCE)
+        self.mic_queue = StageQueue("mic_frames", int(rate / CHUNK * self.FRAME_QUEUE_DURATION), policy="drop_oldest")
+        max_batch = max(1, int(rate / CHUNK * self.CAPTURING_INTERVAL))
+        threading.Thread(target=self.own_voice.run, args=(self.mic_queue, max_batch), daemon=True).start()
+        threading.Thread(
+            target=self.capture_input, args=(self.MIC_DEVICE, stream, self.mic_queue, 1, rate, False), daemon=True
+        ).start()
+
+
+    def capture_input(self, name, stream, frames, channels, rate, required=True):
+        """Capture loop for one device: read CHUNKs into `frames` until recording stops, reopening it after hotplug.
+
+        A device that keeps failing triggers a device rescan; every capture loop then
+        closes its stream and reopens its device by name. A required device that has
+        gone away is retried every DEVICE_RETRY_INTERVAL; an optional one is given up.
+        """
+        errors = 0
         try:
             while self.transcribing:
-                audio_data = self.capture_audio(stream)
+                if stream is None or self.devices.stale:
+                    if stream is not None:
+                        self.devices.close(stream)
+                        stream = None
+                    try:
+                        stream, _ = self.devices.open(name, format=FORMAT, channels=channels, rate=rate, frames_per_buffer=CHUNK)
+                    except (DeviceNotFound, OSError) as e:
+                        if not required:
+                            print(f"Stopped capturing '{name}': {e}")
+                            return
+                        print(f"Waiting for '{name}': {e}")
+                        time.sleep(self.DEVICE_RETRY_INTERVAL)
+                        self.devices.request_rescan()
+                        continue
+                    if stream is None:
+                        time.sleep(CHUNK / rate)  # Other streams are still closing for the rescan
+                        continue
+                    errors = 0
+
+                with self.tracer.span("capture_audio", export=False):
+                    audio_data = self.capture_audio(stream)
                 if audio_data:
-                    if not self.is_silent(audio_data, self.SILENCE_THRESHOLD):
-                        silence_start_time = None
-                        audio_buffer += audio_data
-                    else:
-                        if silence_start_time is None:
-                            silence_start_time = time.time()
-                        elif time.time() - silence_start_time >= self.SILENCE_PAUSE_DURATION:
-                            if len(audio_buffer) > 0:
-                                print("Pause detected, processing audio segment...")
-                                self.save_and_transcribe(audio_buffer)
-                                audio_buffer = b""  # Reset the buffer
-                                silence_start_time = None
+                    errors = 0
+                    frames.put((time.time(), audio_data))
                 else:
-                    print("No audio data captured.")
+                    errors += 1
+                    if errors == self.CAPTURE_ERROR_LIMIT:
+                        print(f"'{name}' stopped delivering audio, rescanning devices...")
+                        self.devices.request_rescan()
         finally:
-            stream.stop_stream()
-            stream.close()
-            print("Meeting transcription stopped.")
+            frames.close()
+            if stream is not None:
+                self.devices.close(stream)
+
+
+    def segment_audio(self, frames):
+        """Segmenter stage: run VAD over captured frames and hand finished utterances to transcription."""
+        max_batch = max(1, int(RATE / CHUNK * self.CAPTURING_INTERVAL))
+        segmenter = self.create_segmenter(self.audio.get_sample_size(FORMAT), max_batch)
+        utterance = None  # Utterance currently being spoken
+
+        while True:
+            batch = frames.get_batch(max_batch)
+            if not batch:
+                break
+            captured_at = [timestamp for timestamp, _ in batch]
+            audio_data = b"".join(frame for _, frame in batch)
+            batch_start = segmenter.time
+
+            if utterance is not None and utterance.session is not None:
+                if utterance.session.done.is_set() and utterance.session.error is None:
+                    # The recognizer endpointed on its own and already committed the utterance
+                    utterance = None
+                    segmenter.clear_segment()
+                else:
+                    utterance.session.feed(audio_data)
+
+            with self.tracer.span("vad", export=False, frames=len(batch)):
+                events = segmenter.process(audio_data)
+
+            for event, at, segment in events:
+                # Wall-clock time the frame holding the event was captured
+                frame_index = min(int((at - batch_start) * RATE / CHUNK), len(captured_at) - 1)
+                event_time = captured_at[max(frame_index, 0)]
+                if event == "start":
+                    print(f"Speech started at {at:.2f}s")
+                    utterance = Utterance(self.tracer.new_utterance_id())
+                    utterance.speech_start = event_time
+                    continue
+                if event == "end":
+                    print(f"Speech ended at {at:.2f}s, processing audio segment...")
+                    if self.speculator and self.latest_interim:
+                        self.speculator.speculate(self.latest_interim, utterance.id if utterance else None)  # Likely end of question
+                else:
+                    print("Maximum segment length reached, flushing audio segment...")
+                if len(segment) > 0 and not self.suppress_own_voice(utterance, event_time):
+                    self.submit_segment(utterance, segment, event_time)
+                utterance = None
+
+            if segmenter.in_speech:
+                if utterance is None:
+                    utterance = Utterance(self.tracer.new_utterance_id())
+                    # A flushed segment is followed by one starting at the end of this batch
+                    utterance.speech_start = captured_at[-1] if events and events[-1][0] == "flush" else captured_at[0]
+                # Hold off streaming while the user is (or may be) talking: their own reply should not be billed
+                if utterance.session is None and self.STREAMING_RECOGNITION and not (self.own_voice and self.own_voice.speaking(captured_at[-1]) is not False):
+                    utterance.session = self.start_streaming_session(utterance)
+                    utterance.session.feed(bytes(segmenter.segment()))  # Pre-roll and speech so far
+
+        # Recording stopped mid-utterance: transcribe what was captured
+        segment = segmenter.finish()
+        if segment is not None and not self.suppress_own_voice(utterance, time.time()):
+            self.submit_segment(utterance, segment, time.time())
+
+
+    @classmethod
+    def create_segmenter(cls, sample_width=2, block_frames=1):
+        """Segmenter with the configured VAD, pre-roll and force-flush settings (also used by batch mode)."""
+        from segmenter import Segmenter  # Imported lazily: pulls in numpy
+        return Segmenter(
+            RATE, CHANNELS, CHUNK, cls.SILENCE_THRESHOLD, sample_width,
+            pre_roll_duration=cls.PRE_ROLL_DURATION,
+            max_segment_duration=cls.MAX_SEGMENT_DURATION,
+            block_frames=block_frames,
+            onset_duration=cls.VAD_ONSET_DURATION,
+            hangover_duration=cls.VAD_HANGOVER_DURATION
+        )
 
 
-    def save_and_transcribe(self, audio_buffer):
-        """Save the accumulated audio buffer to a file and transcribe it."""
-        temp_audio_file = tempfile.NamedTemporaryFile(dir=CUSTOM_TEMP_DIR, delete=False, suffix=".wav")
-        try:
-            audio_segment = AudioSegment(
-                data=audio_buffer,
-                sample_width=self.audio.get_sample_size(FORMAT),
-                frame_rate=RATE,
-                channels=CHANNELS
+    def suppress_own_voice(self, utterance, speech_end):
+        """Drop a segment dominated by the user's microphone instead of sending it to Speech-to-Text.
+
+        Decided (and counted) once per utterance, at its first check; later checks reuse the decision.
+        """
+        if self.own_voice is None or utterance is None or utterance.speech_start is None:
+            return False
+        if utterance.own_voice is None:
+            utterance.own_voice = self.own_voice.is_own_voice(utterance.speech_start, speech_end)
+            if utterance.own_voice:
+                print(f"Own voice for {speech_end - utterance.speech_start:.1f}s, not transcribing the segment")
+                if utterance.session is not None:
+                    utterance.session.finish(timeout=0)  # It may still deliver a final; commit_question drops it
+        return utterance.own_voice
+
+
+    def submit_segment(self, utterance, segment, speech_end):
+        """Queue a finished utterance for the transcription workers (copied out of the ring buffer).
+
+        `speech_end` is the wall-clock time the end of speech was captured.
+        """
+        if utterance is None:
+            utterance = Utterance(self.tracer.new_utterance_id())
+        utterance.audio = bytes(segment)
+        utterance.speech_end = speech_end
+        utterance.queued_at = time.time()
+        self.tracer.record("endpoint", utterance.queued_at - speech_end, utterance.id, start=speech_end)
+        self.segment_queue.put(utterance)
+
+
+    def transcribe_segment(self, utterance):
+        """Transcription stage: finish one queued utterance."""
+        self.tracer.record("segment_queue", time.time() - utterance.queued_at, utterance.id)
+        with self.tracer.span("transcribe", utterance.id, streaming=utterance.session is not None):
+            self.finish_utterance(utterance)
+
+
+    @staticmethod
+    def merge_segments(queued, new):
+        """Fold two batch-only utterances into one when the transcription queue is full."""
+        if queued.session is None and new.session is None:
+            queued.audio += new.audio
+            queued.speech_end = new.speech_end
+            return queued
+        return None
+
+
+    @staticmethod
+    def release_segment(utterance):
+        """Half-close the streaming session of an utterance evicted from the transcription queue."""
+        if utterance.session is not None:
+            utterance.session.finish(timeout=0)
+
+
+    def skip_answer(self, job):
+        """Record a placeholder answer for a question cancelled before it was answered."""
+        print(f"Newer questions pending, skipping question: {job.question}")
+        self.answers[job.index] = ANSWER_SKIPPED
+        self.save_answer(job.index)
+        self.answer_updates.mark_dirty(job.index)
+
+
+    def refresh_overlay(self):
+        """Show rolling per-stage latencies and queue depths in the UI overlay."""
+        if self.ui.overlay_visible:
+            stages = "  ".join(f"{name} {stats['p50']:.0f}/{stats['p95']:.0f}ms" for name, stats in self.tracer.rolling_stats().items())
+            queues = "  ".join(
+                f"{name} {stats['depth']}" + (f"+{stats['in_flight']}" if "in_flight" in stats else "")
+                for name, stats in self.pipeline_stats().items() if "depth" in stats
             )
-            audio_segment.export(temp_audio_file.name, format="wav", codec="pcm_s16le")
-            
-            # Transcribe the saved audio file
-            transcription = self.transcribe_audio_file(temp_audio_file.name)
-            if transcription and transcription.strip():  # Ensure the transcript is not empty
-                self.questions.append(transcription)
-                threading.Thread(target=self.generate_answer, args=(transcription,)).start()
-            else:
-                print("Empty transcription, skipping...")
+            self.ui.show_overlay(f"p50/p95  {stages}\nqueues  {queues}")
+        self.root.after(self.TRACE_OVERLAY_INTERVAL_MS, self.refresh_overlay)
+
+
+    def pipeline_stats(self):
+        """Queue depths, drop/merge counts and worker activity for each pipeline stage."""
+        stats = {
+            "segments": self.segment_queue.stats(),
+            "questions": self.answer_queue.stats(),
+            "transcribers": self.transcription_pool.stats(),
+            "answerers": self.answer_pool.stats(),
+            "providers": self.provider_limits.stats(),
+            "stt": self.stt_requests.stats(),
+            "llm": self.answer_requests.stats(),
+        }
+        if self.frame_queue is not None:
+            stats["frames"] = self.frame_queue.stats()
+        if self.mic_queue is not None:
+            stats["mic_frames"] = self.mic_queue.stats()
+        if self.own_voice is not None:
+            stats["own_voice"] = self.own_voice.stats()
+        return stats
+
+
+    def start_streaming_session(self, utterance):
+        """Open a streaming recognition session that transcribes while the interviewer is talking."""
+        streaming_config, make_request = self.streaming_config_factory()
+        session = StreamingSession(
+            self.speech_client,
+            streaming_config,
+            make_request=make_request,
+            on_interim=lambda text: self.show_interim(text, utterance),
+            on_final=lambda transcription: self.commit_question(transcription, utterance)
+        )
+        return session.start()
+
+
+    def finish_utterance(self, utterance):
+        """Close the utterance, falling back to batch recognition if streaming did not deliver."""
+        session = utterance.session
+        if session is None:
+            self.prepare_and_transcribe(utterance.audio, utterance)
+            return
+
+        session.finish(timeout=self.STREAMING_FINAL_TIMEOUT)
+        if session.error is not None or not session.done.is_set():
+            # A late final must not commit the utterance a second time
+            if not session.abandon():
+                return  # It arrived just now and was committed
+            print("Streaming recognition failed, falling back to batch transcription...")
+            self.prepare_and_transcribe(utterance.audio, utterance)
+
+
+    def show_interim(self, text, utterance=None):
+        """Show the in-progress transcript while the question is still being asked."""
+        self.latest_interim = text
+        self.root.after(0, self.ui.show_interim, text)
+        if self.speculator:
+            self.speculator.observe_interim(text, utterance.id if utterance else None)
+
+
+    def commit_question(self, transcription, utterance=None):
+        """Store a final transcript and queue it for the answer workers."""
+        self.show_interim("")
+        if utterance is None:
+            utterance = Utterance(self.tracer.new_utterance_id())
+        # Streaming results can arrive before the segment ends, so those may be the first check against the mic
+        if self.suppress_own_voice(utterance, utterance.speech_end or time.time()):
+            print(f"Dropping own-voice transcript: {transcription}")
+            if self.speculator:
+                self.speculator.drop(utterance.id)
+            return
+        if utterance.speech_end is not None:
+            print(f"Transcript ready {time.time() - utterance.speech_end:.2f}s after speech ended")
+            self.tracer.record("speech_end_to_transcript", time.time() - utterance.speech_end, utterance.id)
+        if transcription and transcription.strip():  # Ensure the transcript is not empty
+            with self.history_lock:
+                # The answer slot is reserved now, so answers stay in question order
+                if self.session is not None:
+                    index = self.session.add_question(transcription)
+                else:
+                    index = len(self.questions)
+                    self.questions.append(transcription)
+                    self.answers.append("")
+            if self.search_index is not None:
+                self.search_index.add(index, "question", transcription)
+            self.root.after(0, self.populate_questions_and_answers)
+            utterance.question = transcription
+            self.answer_queue.put(AnswerJob(index, transcription, utterance))
+        else:
+            print("Empty transcription, skipping...")
+            if self.speculator:
+                self.speculator.drop(utterance.id)
+
+
+    def prepare_and_transcribe(self, audio_buffer, utterance=None):
+        """Downmix, resample and encode the audio buffer (bytes or a ring buffer view) in memory and transcribe it."""
+        utterance_id = utterance.id if utterance else None
+        try:
+            with self.tracer.span("prepare_audio", utterance_id, bytes=len(audio_buffer)):
+                samples = self.audio_preparer.convert(audio_buffer)
+                content = self.audio_preparer.encode(samples)
+
+            with self.tracer.span("transcribe_audio", utterance_id, bytes=len(content), encoding=self.audio_preparer.encoding):
+                transcription = self.transcribe_audio(content, samples, utterance_id)
+            self.commit_question(transcription, utterance)
         except Exception as e:
             print(f"Error processing audio buffer: {e}")
-        finally:
-            try:
-                temp_audio_file.close()
-                os.unlink(temp_audio_file.name)
-            except Exception as cleanup_error:
-                print(f"Error cleaning up temporary file: {cleanup_error}")
 
 
     def capture_audio(self, stream):
-        """Capture audio frames, preprocess, and return the combined audio data."""
+        """Read one CHUNK of frames; the capture stage does nothing else so the device never overflows."""
         try:
-            frames = [stream.read(CHUNK, exception_on_overflow=False) for _ in range(0, int(RATE / CHUNK * self.CAPTURING_INTERVAL))]
-            raw_audio = b''.join(frames)
-            return raw_audio
+            return stream.read(CHUNK, exception_on_overflow=False)
         except OSError as e:
-            print(f"Audio input overflowed: {e}")
+            print(f"Audio input error: {e}")
             return None
 
 
-    def is_silent(self, audio_data, threshold=None):
-        """Check if the audio data is silent based on amplitude and threshold."""
-        if audio_data and len(audio_data) > 0:
-            amplitude = np.frombuffer(audio_data, dtype=np.int16)
-            if amplitude.size == 0:
-                print("No amplitude data detected.")
-                return True  # Treat as silent
+    @staticmethod
+    def build_recognition_config(encoding="LINEAR16", sample_rate=RATE, channels=CHANNELS):
+        """Recognition settings shared by the batch and streaming paths; batch uploads pass the prepared format."""
+        from google.cloud import speech
+        return speech.RecognitionConfig(
+            encoding=getattr(speech.RecognitionConfig.AudioEncoding, encoding),
+            sample_rate_hertz=sample_rate,
+            audio_channel_count=channels,
+            language_code="en-US",
+        )
 
-            # Compute RMS safely
-            mean_square = np.mean(amplitude ** 2)
-            if mean_square <= 0:  # Prevent invalid sqrt
-                print("Mean square is zero or negative, treating as silent.")
-                mean_square = 1
 
-            rms = np.sqrt(mean_square)
-            print(f"RMS: {rms}, Threshold: {threshold}")
-            return rms < (threshold or self.SILENCE_THRESHOLD)
-        else:
-            print("Invalid or empty audio data.")
-            return True  # Treat as silent
+    @classmethod
+    def build_streaming_config(cls):
+        """Google streaming config and request builder for a StreamingSession."""
+        from google.cloud import speech
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=cls.build_recognition_config(),
+            interim_results=True,
+            single_utterance=True
+        )
+        return streaming_config, lambda chunk: speech.StreamingRecognizeRequest(audio_content=chunk)
+
 
+    def transcribe_audio(self, content, samples, utterance_id=None):
+        """Transcribe prepared audio within its deadline, hedging slow requests and falling back to local recognition.
 
-    def transcribe_audio_file(self, audio_file_path):
-        """Transcribe an audio file using Google Speech-to-Text."""
+        The deadline is STT_DEADLINE plus STT_DEADLINE_PER_SECOND for each second of audio.
+        Returns "" if no backend produced a transcript, so errors never become questions.
+        """
+        deadline = self.STT_DEADLINE + self.STT_DEADLINE_PER_SECOND * len(samples) / self.audio_preparer.sample_rate
         try:
-            with io.open(audio_file_path, "rb") as audio_file:
-                content = audio_file.read()
-
-            audio = speech.RecognitionAudio(content=content)
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=RATE,
-                language_code="en-US",
-            )
+            result = self.stt_requests.call(content, samples, deadline=deadline)
+        except Exception as e:
+            print(f"Speech-to-Text failed: {e}")
+            return ""
+        self.tracer.record("stt_request", result.duration, utterance_id, backend=result.backend,
+                           attempts=result.attempts, hedged=result.hedged)
+        print(f"Transcript ({result.backend}, {result.duration:.2f}s):", result.value)
+        return result.value
+
+
+    def remote_transcribe(self, content, samples):
+        """One Google Speech-to-Text request for the encoded upload."""
+        from google.cloud import speech
+        audio = speech.RecognitionAudio(content=content)
+        config = self.build_recognition_config(
+            self.audio_preparer.encoding, self.audio_preparer.sample_rate, self.audio_preparer.channels
+        )
+        response = self.speech_client.recognize(config=config, audio=audio, timeout=self.REQUEST_TIMEOUT)
+        return " ".join([result.alternatives[0].transcript for result in response.results])
 
-            response = self.speech_client.recognize(config=config, audio=audio)
 
-            # Extract transcription
-            transcript = " ".join([result.alternatives[0].transcript for result in response.results])
-            print("Transcript:", transcript)
-            return transcript
+    def local_transcribe(self, content, samples):
+        return self.local_transcriber.transcribe(samples)
 
-        except Exception as e:
-            print(f"Google Speech-to-Text error: {e}")
-            return f"Error: {e}"
+
+    def generate_answer(self, job):
+        """Answer worker: fill the slot of one scheduled question, streaming tokens into the answer pane."""
+        utterance_id = job.utterance.id if job.utterance else None
+        self.tracer.record("question_queue", job.started_at - job.queued_at, utterance_id)
+        try:
+            if job.cancelled.is_set():
+                if not job.superseded:
+                    self.skip_answer(job)
+                return
+            speculation = self.speculator.claim(job.question, utterance_id) if self.speculator and job.use_speculation else None
+            with self.tracer.span("generate_answer", utterance_id, speculative=speculation is not None, slot=job.index):
+                self.fill_answer(job, speculation=speculation)
+        finally:
+            self.answer_queue.done(job)
 
 
-    def generate_answer(self, question):
-        """Generate an answer using OpenAI's GPT-4 model."""
+    def regenerate_answer(self, index):
+        """Answer a question again ahead of the queue, bypassing the answer cache."""
+        if 0 <= index < len(self.questions) and index < len(self.answers):
+            self.answers[index] = ""
+            self.answer_updates.mark_dirty(index)
+            self.answer_queue.put(AnswerJob(index, self.questions[index], priority=1, use_cache=False, use_speculation=False))
+
+
+    def stream_answer(self, question, index=None, context=None):
+        """Stream the answer to `question` from whichever LLM backend delivers a first token first, within LLM_DEADLINE.
+
+        The `answer_context` for slot `index` (default: a new question) is sent along,
+        unless the caller already built the `context` messages.
+        Returns a HedgedStream recording the winning backend and its time to first token.
+        """
+        if context is None:
+            context = self.answer_context(question, index)
+        return self.answer_requests.stream(question, context)
+
+
+    def answer_context(self, question, index=None):
+        """Conversation before slot `index` to send with `question`; empty for a standalone question.
+
+        With CONTEXT_FOLLOW_UPS_ONLY only questions that look like follow-ups get context,
+        so the others can be served from and stored in the answer cache.
+        """
+        if self.context is None or (self.CONTEXT_FOLLOW_UPS_ONLY and not is_follow_up(question)):
+            return []
+        return self.context.messages(index)
+
+
+    def remote_answer(self, question, context):
+        yield from self.client_answer(self.llm_client, question, context)
+
+
+    def local_answer(self, question, context):
+        yield from self.client_answer(self.local_llm_client, question, context)
+
+
+    def client_answer(self, client, question, context):
+        """Yield the answer from one client while holding one of its provider's concurrency and rate-limit slots."""
+        with self.provider_limits.slot(client.provider):
+            if self.STREAM_ANSWERS:
+                yield from client.stream(question, context)
+            else:
+                yield client.complete(question, context)
+
+
+    def summarize_context(self, summary, turns, max_tokens):
+        """Background summary of older turns for the conversation context."""
+        with self.provider_limits.slot(self.llm_client.provider):
+            return self.llm_client.summarize(summary, turns, max_tokens)
+
+
+    def fill_answer(self, job, speculation=None):
+        """Produce the answer for the job's slot, from a committed speculation or the cache when possible."""
+        index, question, utterance = job.index, job.question, job.utterance
+        utterance_id = utterance.id if utterance else None
+        context = self.answer_context(question, index)
+        # The cache is keyed on the question alone, so only context-free answers may be served from or stored in it
+        use_cache = job.use_cache and self.answer_cache is not None and not context
+        cached = None
+        if speculation is None and use_cache:
+            cached = self.answer_cache.get(question, self.llm_client.model)
+        if cached is not None:
+            print(f"Answer cache hit: {self.answer_cache.stats()}")
+            self.answers[index] = cached
+            self.save_answer(index)
+            self.answer_updates.mark_dirty(index)
+            if self.context:
+                self.context.add_turn(index, question, cached)
+            return
+
+        self.answers[index] = ""
         try:
-            # response = openai.ChatCompletion.create(
-            #     model="gpt-4",
-            #     messages=[
-            #         {"role": "system", "content": "You are a helpful assistant."},
-            #         {"role": "user", "content": f"Answer the following question concisely: {question}"}
-            #     ],
-            #     max_tokens=150
-            # )
-            # answer = response.choices[0].message['content'].strip()
-            answer = "Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer Mock answer ."
-
-            # Add the answer and refresh the UI
-            self.answers.append(answer)
-
-            # Ensure custom selection is respected
-            if self.selected_index is not None and self.selected_index < len(self.questions):
-                # Keep the current selection and do not auto-select the last question
-                self.root.after(0, self.populate_questions_and_answers)
+            started = time.time()
+            tokens = speculation.follow() if speculation is not None else self.stream_answer(question, index, context)
+            if speculation is None:
+                self.tracer.record("llm_request", tokens.duration, utterance_id, backend=tokens.backend,
+                                   attempts=tokens.attempts, hedged=tokens.hedged)
+                if tokens.backend != self.llm_client.provider:
+                    print(f"Answer {index} from {tokens.backend} after {tokens.duration:.2f}s")
+            for token in tokens:
+                if job.cancelled.is_set():
+                    tokens.close()
+                    if job.superseded:
+                        return  # The slot belongs to the newer job now; leave its text and journal alone
+                    self.answers[index] += ANSWER_STOPPED
+                    break
+                if not self.answers[index]:
+                    self.tracer.record("first_token", time.time() - started, utterance_id)
+                    if utterance is not None and utterance.speech_end is not None and "first_question" not in self.startup:
+                        self.startup["first_question"] = time.time() - utterance.speech_end
+                        print(f"First answer started {self.startup['first_question']:.2f}s after the first question ended")
+                self.answers[index] += token
+                self.answer_updates.mark_dirty(index)
             else:
-                # Auto-select the last question
-                self.selected_index = len(self.questions) - 1
-                self.root.after(0, self.populate_questions_and_answers)
+                # Cache only what the remote model produced for the question alone: not a local fallback's
+                # answer (it would be served under the remote model's key) and not a speculation
+                # (its backend and context were decided before the final transcript)
+                remote = speculation is None and tokens.backend == self.llm_client.provider
+                if self.answer_cache and remote and not context:
+                    self.answer_cache.put(question, self.answers[index], self.llm_client.model)
+                if self.context:
+                    self.context.add_turn(index, question, self.answers[index])
         except Exception as e:
             print(f"Error generating answer: {e}")
-            self.answers.append("Error generating answer.")
-            self.root.after(0, self.populate_questions_and_answers)
+            if job.superseded:
+                return
+            self.answers[index] = ANSWER_ERROR
+        self.save_answer(index)
+        self.answer_updates.mark_dirty(index)
+
+
+    def render_answer(self, index):
+        """Show the current text of a (possibly still streaming) answer."""
+        with self.tracer.span("render_answer", export=False):
+            self.ui.set_answer(index, self.answers[index])
+        if index == self.selected_index:
+            self.ui.ensure_answer_visibility()
 
 
     def populate_questions_and_answers(self):
-        """Update the UI to display all questions and answers."""
-        self.ui.question_text.config(state=tk.NORMAL)
-        self.ui.answer_text.config(state=tk.NORMAL)
-        self.ui.question_text.delete(1.0, tk.END)
-        self.ui.answer_text.delete(1.0, tk.END)
-
-        # Populate questions in the text widget
-        for i, question in enumerate(self.questions):
-            tag = f"question_{i}"
-            start = self.ui.question_text.index(tk.END)
-            self.ui.question_text.insert(tk.END, f"{question}\n\n", tag)
-            end = self.ui.question_text.index(tk.END)
-            self.ui.question_text.tag_add(tag, start, end)
-            self.ui.question_text.tag_bind(tag, "<Button-1>", lambda event, index=i: self.on_question_select(index))
-
-        # Populate answers in the text widget
-        for answer in self.answers:
-            self.ui.answer_text.insert(tk.END, f"{answer}\n\n")
-
-        self.ui.question_text.config(state=tk.DISABLED)
-        self.ui.answer_text.config(state=tk.DISABLED)
+        """Append new questions and answers to the UI; cost is independent of the session length."""
+        with self.tracer.span("populate_questions_and_answers"):
+            self.ui.update_questions_and_answers(self.questions, self.answers)
 
         # Highlight the last question and answer by default
         self.selected_index = len(self.questions) - 1 if self.questions else None
@@ -248,20 +943,11 @@ class InterviewAssistant:
             self.ui.scroll_to_end()
 
 
-    def get_device_index(self, device_name_windows="CABLE Output", device_name_mac="BlackHole"):
-        target_device_name = device_name_windows if platform.system() == "Windows" else device_name_mac
-        indices = [i for i in range(self.audio.get_device_count())
-                   if target_device_name in self.audio.get_device_info_by_index(i).get("name", "")]
-        if indices:
-            print(f"Using device '{target_device_name}' at index {indices[0]}")
-            return indices[0]
-        raise ValueError(f"Device '{target_device_name}' not found")
-
- 
     def on_question_select(self, index):
         """Handle selection of a question from the UI."""
         self.selected_index = index
         self.ui.highlight_answer(self.selected_index, self.answers)
+        self.answer_queue.prioritize(index)  # Answer the question the user is looking at next
 
 
 
@@ -0,0 +1,144 @@
+import threading
+from collections import deque
+
+
+
+class Utterance:
+    """One segmented stretch of speech and what the pipeline has learned about it so far."""
+
+    def __init__(self, utterance_id, session=None):
+        self.id = utterance_id
+        self.session = session  # Streaming recognition session, if one was opened
+        self.audio = b""
+        self.speech_start = None  # Wall-clock time the start of speech was captured
+        self.speech_end = None  # Wall-clock time the end of speech was captured
+        self.own_voice = None  # Dominated by the user's microphone (never committed as a question); None until checked
+        self.queued_at = None  # When it last entered a stage queue
+        self.question = None
+
+
+
+class StageQueue:
+    """Bounded queue between pipeline stages whose `put` never blocks.
+
+    When the queue is full the overflow policy decides what gives way:
+    "drop_oldest" evicts the oldest item, "drop_newest" rejects the new one, and
+    "merge" folds the new item into the newest queued one via `merge(old, new)`
+    (falling back to drop_oldest when `merge` returns None). Evicted items are
+    passed to `on_drop` so stages can release resources they hold.
+    """
+
+    def __init__(self, name, maxsize, policy="drop_oldest", merge=None, on_drop=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.merge = merge
+        self.on_drop = on_drop
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.merged = 0
+        self.high_water = 0
+
+
+    def put(self, item):
+        """Enqueue an item without blocking; returns False if the item itself was dropped."""
+        dropped = None
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                if self.policy == "merge" and self.merge and self.items:
+                    merged = self.merge(self.items[-1], item)
+                    if merged is not None:
+                        self.items[-1] = merged
+                        self.merged += 1
+                        self.condition.notify()
+                        return True
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    dropped = item
+                else:
+                    dropped = self.items.popleft()
+                    self.dropped += 1
+            if dropped is not item:
+                self.items.append(item)
+                self.high_water = max(self.high_water, len(self.items))
+                self.condition.notify()
+
+        if dropped is not None and self.on_drop:
+            self.on_drop(dropped)
+        return dropped is not item
+
+
+    def get(self, timeout=None):
+        """Return the next item, or None once the queue is closed and drained (or on timeout)."""
+        batch = self.get_batch(1, timeout)
+        return batch[0] if batch else None
+
+
+    def get_batch(self, max_items, timeout=None):
+        """Wait for at least one item and return up to `max_items` of them; [] once closed and drained."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.items or self.closed, timeout):
+                return []
+            return [self.items.popleft() for _ in range(min(max_items, len(self.items)))]
+
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+    def __len__(self):
+        return len(self.items)
+
+
+    def stats(self):
+        return {"depth": len(self.items), "dropped": self.dropped, "merged": self.merged, "high_water": self.high_water}
+
+
+
+class WorkerPool:
+    """Run `handler` on every item taken from `source` using a fixed number of threads."""
+
+    def __init__(self, name, source, handler, workers=1):
+        self.name = name
+        self.source = source
+        self.handler = handler
+        self.busy = 0
+        self.processed = 0
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self.run, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+
+    def run(self):
+        while True:
+            item = self.source.get()
+            if item is None:
+                return
+            with self.lock:
+                self.busy += 1
+            try:
+                self.handler(item)
+            except Exception as e:
+                print(f"{self.name} worker error: {e}")
+            finally:
+                with self.lock:
+                    self.busy -= 1
+                    self.processed += 1
+
+
+    def join(self, timeout=None):
+        for thread in self.threads:
+            thread.join(timeout)
+
+
+    def stats(self):
+        return {"workers": len(self.threads), "busy": self.busy, "processed": self.processed}
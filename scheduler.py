@@ -0,0 +1,253 @@
+import time
+import heapq
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+
+class AnswerJob:
+    """Request to answer the question in slot `index`; the slot number doubles as the sequence number."""
+
+    def __init__(self, index, question, utterance=None, priority=0, use_cache=True, use_speculation=True):
+        self.index = index
+        self.question = question
+        self.utterance = utterance
+        self.priority = priority
+        self.use_cache = use_cache
+        self.use_speculation = use_speculation  # May take over a speculative answer started for this question
+        self.queued_at = time.time()
+        self.started_at = None
+        self.cancelled = threading.Event()
+        self.superseded = False  # Cancelled because a newer job took over the same slot
+
+
+    def key(self):
+        # heapq pops the smallest key: highest priority first, then the most recent question
+        return (-self.priority, -self.index)
+
+
+
+class AnswerQueue:
+    """Priority queue of answer jobs that favours the newest question and cancels stale ones.
+
+    Jobs run highest priority first and, within a priority, newest first. When a job
+    more than `stale_after` questions newer than an unprioritized job arrives, the old
+    job is cancelled: pending jobs are removed and handed to `on_cancel`, running jobs
+    get their `cancelled` event set so the worker can stop early. Works as the `source`
+    of a WorkerPool; the handler must call `done(job)` when it finishes.
+    """
+
+    def __init__(self, maxsize, stale_after=None, on_cancel=None, window=50):
+        self.maxsize = maxsize
+        self.stale_after = stale_after
+        self.on_cancel = on_cancel
+        self.heap = []
+        self.pending = {}  # Slot index -> queued job
+        self.running = {}  # Slot index -> job being answered
+        self.condition = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.cancelled = 0
+        self.high_water = 0
+        self.waits = deque(maxlen=window)
+
+
+    def put(self, job):
+        """Queue a job, replacing any pending or running job for the same slot."""
+        with self.condition:
+            removed = self.cancel_locked(job.index, superseded=True)
+            self.pending[job.index] = job
+            heapq.heappush(self.heap, (job.key(), job.index, job))
+            if self.stale_after is not None:
+                removed += self.cancel_stale_locked(job.index - self.stale_after)
+            while len(self.pending) > self.maxsize:
+                _, _, oldest = max(
+                    ((queued.key(), index, queued) for index, queued in self.pending.items()), key=lambda entry: entry[0]
+                )
+                del self.pending[oldest.index]
+                oldest.cancelled.set()
+                self.dropped += 1
+                removed.append(oldest)
+            self.high_water = max(self.high_water, len(self.pending))
+            self.condition.notify()
+
+        for cancelled in removed:
+            if cancelled.index != job.index and self.on_cancel:
+                self.on_cancel(cancelled)
+
+
+    def get(self, timeout=None):
+        """Return the next job to run, or None once the queue is closed and drained (or on timeout)."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.pending or self.closed, timeout):
+                return None
+            while self.heap:
+                _, index, job = heapq.heappop(self.heap)
+                if self.pending.get(index) is job:
+                    del self.pending[index]
+                    job.started_at = time.time()
+                    self.running[index] = job
+                    self.waits.append(job.started_at - job.queued_at)
+                    return job
+            return None
+
+
+    def done(self, job):
+        with self.condition:
+            if self.running.get(job.index) is job:
+                del self.running[job.index]
+
+
+    def prioritize(self, index, priority=1):
+        """Raise the priority of the pending or running job for slot `index` (e.g. the user selected it)."""
+        with self.condition:
+            job = self.pending.get(index) or self.running.get(index)
+            if job is None or job.priority >= priority:
+                return False
+            job.priority = priority
+            if index in self.pending:
+                heapq.heappush(self.heap, (job.key(), index, job))  # The old heap entry is skipped as stale
+            return True
+
+
+    def cancel(self, index):
+        """Cancel the job for slot `index`; returns the pending job removed, if any."""
+        with self.condition:
+            removed = self.cancel_locked(index)
+        return removed[0] if removed else None
+
+
+    def cancel_locked(self, index, superseded=False):
+        running = self.running.get(index)
+        if running is not None:
+            running.superseded = superseded
+            running.cancelled.set()
+            self.cancelled += 1
+        job = self.pending.pop(index, None)
+        if job is None:
+            return []
+        job.superseded = superseded
+        job.cancelled.set()
+        self.cancelled += 1
+        return [job]
+
+
+    def cancel_stale_locked(self, oldest_wanted):
+        """Cancel unprioritized jobs for slots before `oldest_wanted`; returns the pending ones removed."""
+        removed = []
+        for jobs in (self.pending, self.running):
+            for index, job in list(jobs.items()):
+                if index < oldest_wanted and job.priority <= 0 and not job.cancelled.is_set():
+                    job.cancelled.set()
+                    self.cancelled += 1
+                    if jobs is self.pending:
+                        del self.pending[index]
+                        removed.append(job)
+        return removed
+
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+    def __len__(self):
+        return len(self.pending)
+
+
+    def stats(self):
+        with self.condition:
+            waits = sorted(self.waits)
+            return {
+                "depth": len(self.pending),
+                "in_flight": len(self.running),
+                "dropped": self.dropped,
+                "cancelled": self.cancelled,
+                "high_water": self.high_water,
+                "wait_p50": round(waits[len(waits) // 2], 4) if waits else None,
+                "wait_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else None,
+            }
+
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per `period` seconds, with bursts up to `rate`."""
+
+    def __init__(self, rate, period=60.0):
+        self.rate = rate
+        self.period = period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    def acquire(self):
+        """Block until a request may be made; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.period)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) * self.period / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+
+class ProviderLimits:
+    """Per-provider caps on concurrent requests and requests per minute.
+
+    `limits` maps a provider name to {"concurrency": n, "requests_per_minute": n};
+    either key may be omitted, and unlisted providers are unlimited.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = limits or {}
+        self.semaphores = {}
+        self.rate_limiters = {}
+        self.in_flight = {}
+        self.throttled_seconds = {}
+        self.lock = threading.Lock()
+        for provider, limit in self.limits.items():
+            if limit.get("concurrency"):
+                self.semaphores[provider] = threading.BoundedSemaphore(limit["concurrency"])
+            if limit.get("requests_per_minute"):
+                self.rate_limiters[provider] = RateLimiter(limit["requests_per_minute"])
+
+
+    @contextmanager
+    def slot(self, provider):
+        """Hold one of `provider`'s concurrency slots (and a rate-limit token) for the duration of a request."""
+        semaphore = self.semaphores.get(provider)
+        rate_limiter = self.rate_limiters.get(provider)
+        started = time.monotonic()
+        if semaphore:
+            semaphore.acquire()
+        try:
+            if rate_limiter:
+                rate_limiter.acquire()
+            with self.lock:
+                self.in_flight[provider] = self.in_flight.get(provider, 0) + 1
+                self.throttled_seconds[provider] = self.throttled_seconds.get(provider, 0.0) + time.monotonic() - started
+            try:
+                yield
+            finally:
+                with self.lock:
+                    self.in_flight[provider] -= 1
+        finally:
+            if semaphore:
+                semaphore.release()
+
+
+    def stats(self):
+        with self.lock:
+            return {
+                provider: {"in_flight": self.in_flight.get(provider, 0), "throttled_seconds": round(self.throttled_seconds.get(provider, 0.0), 3)}
+                for provider in set(self.in_flight) | set(self.limits)
+            }
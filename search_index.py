@@ -0,0 +1,124 @@
+import re
+import math
+import heapq
+import queue
+import bisect
+import threading
+from collections import Counter
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+FIELD_WEIGHTS = {"question": 2.0, "answer": 1.0}
+
+
+def tokenize(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+
+class SearchIndex:
+    """Incremental inverted index over the questions and answers of a session.
+
+    `add(slot, field, text)` queues a document field for indexing on a background
+    thread, replacing whatever that field held before, so callers on the Tk thread or
+    the answer workers never pay for tokenizing. `search` ranks slots with BM25 over
+    both fields (questions weighted higher) and treats the last query word as a
+    prefix, so results can be shown as the user types.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, max_prefix_terms=20):
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_terms = max_prefix_terms
+        self.postings = {}  # Term -> {(slot, field): term frequency}
+        self.terms = []  # Sorted vocabulary, for prefix matches
+        self.fields = {}  # (slot, field) -> Counter of its terms
+        self.lengths = {}  # (slot, field) -> number of words
+        self.total_length = 0
+        self.updates = queue.Queue()
+        self.lock = threading.Lock()
+        self.indexed = 0
+        threading.Thread(target=self.run, daemon=True).start()
+
+
+    def add(self, slot, field, text):
+        """Queue the latest text of a slot's question or answer for indexing."""
+        self.updates.put((slot, field, text))
+
+
+    def run(self):
+        while True:
+            slot, field, text = self.updates.get()
+            counts = Counter(tokenize(text))
+            with self.lock:
+                self.replace((slot, field), counts)
+                self.indexed += 1
+
+
+    def replace(self, key, counts):
+        """Swap the postings of one document field (caller holds the lock)."""
+        old = self.fields.pop(key, None)
+        if old:
+            self.total_length -= self.lengths.pop(key)
+            for term in old:
+                postings = self.postings[term]
+                del postings[key]
+                if not postings:
+                    del self.postings[term]
+                    del self.terms[bisect.bisect_left(self.terms, term)]
+        if not counts:
+            return
+        self.fields[key] = counts
+        self.lengths[key] = sum(counts.values())
+        self.total_length += self.lengths[key]
+        for term, frequency in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                bisect.insort(self.terms, term)
+            postings[key] = frequency
+
+
+    def expand(self, prefix):
+        """Indexed terms starting with `prefix`, at most `max_prefix_terms` of them."""
+        start = bisect.bisect_left(self.terms, prefix)
+        matches = []
+        for term in self.terms[start:start + self.max_prefix_terms]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+
+    def search(self, query, limit=10):
+        """Return up to `limit` (slot, score) pairs for `query`, best first."""
+        words = tokenize(query)
+        if not words:
+            return []
+        prefix_words = query[-1:].isalnum() or query.endswith("_")  # Still typing the last word
+        scores = {}
+        with self.lock:
+            if not self.fields:
+                return []
+            documents = len(self.fields)
+            average_length = self.total_length / documents
+            for position, word in enumerate(words):
+                is_prefix = prefix_words and position == len(words) - 1
+                for term in self.expand(word) if is_prefix else [word]:
+                    postings = self.postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                    if term != word:
+                        idf *= 0.8  # Prefer exact words over completions
+                    for key, frequency in postings.items():
+                        length = self.lengths[key]
+                        tf = frequency * (self.k1 + 1) / (frequency + self.k1 * (1 - self.b + self.b * length / average_length))
+                        scores[key[0]] = scores.get(key[0], 0.0) + FIELD_WEIGHTS[key[1]] * idf * tf
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+    def stats(self):
+        with self.lock:
+            return {"documents": len(self.fields), "terms": len(self.terms), "indexed": self.indexed, "pending": self.updates.qsize()}
@@ -0,0 +1,87 @@
+from audio_buffer import AudioRingBuffer
+from vad import VoiceActivityDetector
+
+
+
+class Segmenter:
+    """Cuts a PCM stream into utterances: VAD events over a ring buffer, with pre-roll and a force-flush.
+
+    Shared by the live pipeline and batch mode so both segment audio the same way.
+    `process` takes the next block of audio and returns its events as
+    (event, seconds, segment) tuples:
+
+    - ("start", at, None) when speech starts,
+    - ("end", at, segment) when it ends (the segment may be empty),
+    - ("flush", at, segment) when a segment reaches `max_segment_duration` mid-speech;
+      the next segment starts right after it.
+
+    `seconds` is the position in the stream in seconds of audio, and `segment` is a
+    zero-copy view (pre-roll included) that stays valid until the next `process` call.
+    """
+
+    def __init__(self, rate, channels, frame_size, threshold, sample_width=2, pre_roll_duration=0.3,
+                 max_segment_duration=60, block_frames=1, onset_duration=0.05, hangover_duration=0.25):
+        self.frame_width = channels * sample_width
+        self.bytes_per_second = rate * self.frame_width
+        self.pre_roll = int(pre_roll_duration * self.bytes_per_second)
+        self.max_segment = int(max_segment_duration * self.bytes_per_second)
+        # Room for a full segment plus its pre-roll and one block of headroom before the force-flush
+        self.ring = AudioRingBuffer(self.max_segment + self.pre_roll + block_frames * frame_size * self.frame_width, self.frame_width)
+        self.vad = VoiceActivityDetector(
+            rate, channels, frame_size, threshold,
+            onset_duration=onset_duration,
+            hangover_duration=hangover_duration
+        )
+
+
+    @property
+    def time(self):
+        """Seconds of audio the VAD has processed so far."""
+        return self.vad.time
+
+
+    @property
+    def in_speech(self):
+        return self.vad.in_speech
+
+
+    def process(self, audio_data):
+        """Append a block of audio and return the (event, seconds, segment) events it produced."""
+        ring = self.ring
+        ring.write(audio_data)
+        events = []
+        for event, at in self.vad.process(audio_data):
+            offset = int(at * self.bytes_per_second)
+            if event == "start":
+                ring.open_segment(offset, self.pre_roll)
+                events.append(("start", at, None))
+            else:
+                ring.extend_segment(offset)
+                events.append(("end", at, ring.segment()))
+                ring.clear_segment()
+
+        if self.vad.in_speech:
+            if ring.segment_start is None:
+                ring.open_segment(ring.written - len(audio_data))
+            ring.extend_segment()
+            if ring.segment_length() >= self.max_segment:
+                events.append(("flush", ring.segment_end / self.bytes_per_second, ring.segment()))
+                ring.open_segment(ring.written)
+        return events
+
+
+    def segment(self):
+        """Zero-copy view of the segment still open (pre-roll and speech so far)."""
+        return self.ring.segment()
+
+
+    def clear_segment(self):
+        """Forget the open segment, e.g. when a streaming recognizer already handled it."""
+        self.ring.clear_segment()
+
+
+    def finish(self):
+        """The segment cut off by the end of the stream, or None."""
+        if self.ring.segment_length() == 0:
+            return None
+        return self.ring.segment()
@@ -0,0 +1,309 @@
+import os
+import json
+import mmap
+import time
+import struct
+import threading
+from collections import OrderedDict
+
+
+
+INDEX_HEADER = struct.Struct("<4sIQ")  # magic, version, journal bytes covered by the index
+INDEX_ENTRY = struct.Struct("<QIQI")  # question offset/length, answer offset/length in the journal
+INDEX_MAGIC = b"IASX"
+INDEX_VERSION = 1
+
+
+
+class SlotList:
+    """List-like view of the questions or answers of a SessionStore, indexed by slot."""
+
+    def __init__(self, store, field):
+        self.store = store
+        self.field = field
+
+
+    def __len__(self):
+        return len(self.store)
+
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.store)
+        return self.store.get(index)[self.field]
+
+
+    def __setitem__(self, index, text):
+        if self.field != 1:
+            raise TypeError("questions are append-only")
+        self.store.set_answer(index, text)
+
+
+    def __iter__(self):
+        for index in range(len(self.store)):
+            yield self[index]
+
+
+
+class SessionStore:
+    """Interview history backed by an append-only journal, with only a recent window kept in memory.
+
+    Every question, and every finished answer, is appended to `<name>.jsonl` as one
+    JSON line and fsynced, so a crash loses at most the answer being streamed. A
+    fixed-width index (`<name>.idx`) maps each slot to the journal offsets of its
+    latest question and answer; it is read through mmap to page older slots in on
+    demand. The index header records how much of the journal it covers, so reopening
+    a session only rescans the journal tail written after the last index update and
+    then loads the newest `window` slots: O(window), not O(session length).
+    `close` leaves a `<name>.closed` marker, so only a session that ended in a crash
+    is picked up again by `open_latest`.
+    """
+
+    def __init__(self, path, window=200, page_cache=256):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.closed_path = os.path.splitext(path)[0] + ".closed"
+        self.window = window
+        self.page_cache = page_cache
+        self.lock = threading.RLock()
+        self.slots = {}  # Slot -> [question, answer, saved] for the in-memory window
+        self.pages = OrderedDict()  # LRU of older slots paged in from the journal
+        self.count = 0
+        self.map = None
+        self.closed = False
+        self.journal = open(path, "ab")
+        self.reader = open(path, "rb")
+        self.index = open(self.index_path, "r+b" if os.path.exists(self.index_path) else "w+b")
+        self.recover()
+        self.window_start = max(0, self.count - window)
+        for slot in range(self.window_start, self.count):
+            question, answer = self.read_slot(slot)
+            self.slots[slot] = [question, answer, True]
+        self.questions = SlotList(self, 0)
+        self.answers = SlotList(self, 1)
+
+
+    @classmethod
+    def open_latest(cls, directory, window=200, resume_within=12 * 3600):
+        """Reopen the most recent session in `directory` if it was not closed cleanly and was used within `resume_within` seconds, else start one."""
+        os.makedirs(directory, exist_ok=True)
+        journals = [os.path.join(directory, name) for name in os.listdir(directory) if name.startswith("session-") and name.endswith(".jsonl")]
+        if journals:
+            latest = max(journals, key=os.path.getmtime)
+            closed = os.path.exists(os.path.splitext(latest)[0] + ".closed")
+            if not closed and time.time() - os.path.getmtime(latest) < resume_within:
+                return cls(latest, window)
+        base = os.path.join(directory, time.strftime("session-%Y%m%d-%H%M%S"))
+        path, suffix = base + ".jsonl", 1
+        while os.path.exists(path):  # Restarted within the same second
+            suffix += 1
+            path = f"{base}-{suffix}.jsonl"
+        return cls(path, window)
+
+
+    def __len__(self):
+        return self.count
+
+
+    def recover(self):
+        """Bring the index up to date with the journal, rescanning only what it does not cover yet."""
+        header = self.index.read(INDEX_HEADER.size)
+        covered = 0
+        if len(header) == INDEX_HEADER.size:
+            magic, version, covered = INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                covered = 0
+        journal_size = os.path.getsize(self.path)
+        if covered == 0 or covered > journal_size:
+            # Missing or inconsistent index: rebuild it from the whole journal
+            covered = 0
+            self.index.truncate(0)
+        self.index.seek(0, os.SEEK_END)
+        self.count = max(0, (self.index.tell() - INDEX_HEADER.size) // INDEX_ENTRY.size)
+        self.write_header(covered)
+
+        self.reader.seek(covered)
+        offset = covered
+        for line in self.reader:
+            if not line.endswith(b"\n"):
+                break  # Torn write at the end of the journal
+            try:
+                record = json.loads(line)
+                self.index_record(record, offset, len(line))
+            except (ValueError, KeyError):
+                pass
+            offset += len(line)
+        if offset < journal_size:
+            self.journal.truncate(offset)  # Drop the torn tail so new records start on a line boundary
+            self.journal.seek(0, os.SEEK_END)
+        self.write_header(offset)
+        self.remap()
+
+
+    def write_header(self, covered):
+        self.index.seek(0)
+        self.index.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, covered))
+        self.index.flush()
+
+
+    def read_entry(self, slot):
+        position = INDEX_HEADER.size + slot * INDEX_ENTRY.size
+        if self.map is None or position + INDEX_ENTRY.size > len(self.map):
+            self.remap()
+        return INDEX_ENTRY.unpack_from(self.map, position)
+
+
+    def remap(self):
+        if self.map is not None:
+            self.map.close()
+        self.index.flush()
+        self.map = mmap.mmap(self.index.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+    def index_record(self, record, offset, length):
+        """Point the slot of a journal record at it, growing the index for new slots."""
+        slot = record["i"]
+        if slot >= self.count:
+            self.index.seek(INDEX_HEADER.size + self.count * INDEX_ENTRY.size)
+            self.index.write(INDEX_ENTRY.pack(0, 0, 0, 0) * (slot + 1 - self.count))
+            self.count = slot + 1
+        question_offset, question_length, answer_offset, answer_length = self.read_entry_unmapped(slot)
+        if "q" in record:
+            question_offset, question_length = offset, length
+        if "a" in record:
+            answer_offset, answer_length = offset, length
+        self.index.seek(INDEX_HEADER.size + slot * INDEX_ENTRY.size)
+        self.index.write(INDEX_ENTRY.pack(question_offset, question_length, answer_offset, answer_length))
+
+
+    def read_entry_unmapped(self, slot):
+        self.index.seek(INDEX_HEADER.size + slot * INDEX_ENTRY.size)
+        return INDEX_ENTRY.unpack(self.index.read(INDEX_ENTRY.size))
+
+
+    def read_record(self, offset, length, field):
+        if length == 0:
+            return ""
+        self.reader.seek(offset)
+        return json.loads(self.reader.read(length))[field]
+
+
+    def read_slot(self, slot):
+        question_offset, question_length, answer_offset, answer_length = self.read_entry(slot)
+        return self.read_record(question_offset, question_length, "q"), self.read_record(answer_offset, answer_length, "a")
+
+
+    def append(self, record):
+        """Durably append one journal record and index it."""
+        if self.closed:
+            return  # An answer finishing after shutdown
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        offset = self.journal.tell()
+        self.journal.write(line)
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.index_record(record, offset, len(line))
+        self.write_header(offset + len(line))
+
+
+    def add_question(self, question):
+        """Append a question and reserve its (empty) answer slot; returns the slot."""
+        with self.lock:
+            slot = self.count
+            self.append({"i": slot, "q": question, "ts": round(time.time(), 3)})
+            self.slots[slot] = [question, "", False]
+            self.evict()
+            return slot
+
+
+    def set_answer(self, slot, answer):
+        """Update an answer in memory (e.g. while it streams); `save_answer` makes it durable."""
+        with self.lock:
+            entry = self.slots.get(slot)
+            if entry is None:
+                entry = self.slots[slot] = list(self.get(slot)) + [False]  # Pin an older slot being edited
+                self.pages.pop(slot, None)
+            entry[1] = answer
+            entry[2] = False
+
+
+    def save_answer(self, slot):
+        """Journal the current answer of `slot`; saved slots may leave memory once outside the window."""
+        with self.lock:
+            entry = self.slots.get(slot)
+            if entry is None or entry[2]:
+                return
+            self.append({"i": slot, "a": entry[1], "ts": round(time.time(), 3)})
+            entry[2] = True
+            self.evict()
+
+
+    def evict(self):
+        self.window_start = max(0, self.count - self.window)
+        for slot in [slot for slot, entry in self.slots.items() if slot < self.window_start and entry[2]]:
+            del self.slots[slot]
+
+
+    def get(self, slot):
+        """(question, answer) for a slot, from memory or paged in from the journal."""
+        with self.lock:
+            if not 0 <= slot < self.count:
+                raise IndexError(slot)
+            entry = self.slots.get(slot)
+            if entry is not None:
+                return entry[0], entry[1]
+            page = self.pages.get(slot)
+            if page is None:
+                page = self.pages[slot] = self.read_slot(slot)
+                if len(self.pages) > self.page_cache:
+                    self.pages.popitem(last=False)
+            else:
+                self.pages.move_to_end(slot)
+            return page
+
+
+    def page(self, before, count):
+        """Up to `count` (slot, question, answer) tuples for the slots just before `before`, oldest first."""
+        start = max(0, before - count)
+        return [(slot, *self.get(slot)) for slot in range(start, before)]
+
+
+    def records(self):
+        """Yield every complete journal record in order, through a separate file handle (safe off the main thread)."""
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+    def stats(self):
+        with self.lock:
+            return {
+                "path": self.path,
+                "slots": self.count,
+                "in_memory": len(self.slots),
+                "paged": len(self.pages),
+                "journal_bytes": os.path.getsize(self.path) if self.closed else self.journal.tell(),
+            }
+
+
+    def close(self):
+        """Close the files and mark the session as ended cleanly, so it is not resumed."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            for f in (self.journal, self.reader, self.index):
+                f.close()
+            try:
+                with open(self.closed_path, "w", encoding="utf-8") as f:
+                    f.write(f"{time.time():.3f}\n")
+            except OSError as e:
+                print(f"Error marking session closed: {e}")
@@ -0,0 +1,177 @@
+import time
+import threading
+from answer_cache import normalize_question, similarity, symbol_terms
+
+
+
+class SpeculativeAnswer:
+    """An answer generated ahead of the final transcript; tokens can be followed while still streaming."""
+
+    def __init__(self, question, utterance_id=None):
+        self.question = question
+        self.utterance_id = utterance_id
+        self.normalized = normalize_question(question)
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self.cancelled = threading.Event()
+        self.condition = threading.Condition()
+        self.started = time.time()
+
+
+    def add(self, token):
+        with self.condition:
+            self.tokens.append(token)
+            self.condition.notify_all()
+
+
+    def finish(self, error=None):
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+
+    def follow(self):
+        """Yield every token produced so far, then the rest as they arrive."""
+        position = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.tokens) > position or self.done)
+                tokens = self.tokens[position:]
+                done = self.done
+            position += len(tokens)
+            yield from tokens
+            if done:
+                break
+        if self.error is not None:
+            raise self.error
+
+
+
+class Speculator:
+    """Start answering on a stable interim transcript or a likely end of question, before the final transcript.
+
+    `claim` hands the speculative answer over when the final transcript matches it
+    (similarity >= `match_threshold`) and cancels it otherwise. Speculations carry the
+    id of the utterance they were started for, so a question claimed late never
+    cancels the speculation for a newer utterance still being asked. Stats compare the
+    speculations wasted against the head start gained by the committed ones.
+    """
+
+    def __init__(self, stream_answer, match_threshold=0.85, stable_duration=0.4):
+        self.stream_answer = stream_answer
+        self.match_threshold = match_threshold
+        self.stable_duration = stable_duration
+        self.current = None
+        self.last_interim = ""
+        self.timer = None
+        self.lock = threading.Lock()
+        self.started = 0
+        self.committed = 0
+        self.wasted = 0
+        self.wasted_tokens = 0
+        self.saved_seconds = 0.0
+
+
+    def observe_interim(self, text, utterance_id=None):
+        """Speculate once an interim transcript has stopped changing for `stable_duration`; empty text resets."""
+        normalized = normalize_question(text)
+        with self.lock:
+            if normalized == self.last_interim:
+                return
+            self.last_interim = normalized
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if normalized:
+                # Recognizers often send no further interim while the speaker pauses, so don't wait for one
+                self.timer = threading.Timer(self.stable_duration, self.on_stable, args=(text, normalized, utterance_id))
+                self.timer.daemon = True
+                self.timer.start()
+
+
+    def on_stable(self, text, normalized, utterance_id):
+        with self.lock:
+            if normalized != self.last_interim:
+                return
+            self.timer = None
+        self.speculate(text, utterance_id)
+
+
+    def speculate(self, question, utterance_id=None):
+        """Start generating an answer to `question`, replacing any speculation for a different text."""
+        spec = SpeculativeAnswer(question, utterance_id)
+        if not spec.normalized:
+            return
+        with self.lock:
+            if self.current is not None:
+                if self.current.normalized == spec.normalized:
+                    return
+                self.discard(self.current)
+            self.current = spec
+            self.started += 1
+        threading.Thread(target=self.run, args=(spec,), daemon=True).start()
+
+
+    def run(self, spec):
+        try:
+            for token in self.stream_answer(spec.question):
+                if spec.cancelled.is_set():
+                    break
+                spec.add(token)
+        except Exception as e:
+            print(f"Speculative answer error: {e}")
+            spec.finish(e)
+        else:
+            spec.finish()
+
+
+    def discard(self, spec):
+        spec.cancelled.set()
+        self.wasted += 1
+        self.wasted_tokens += len(spec.tokens)
+
+
+    def drop(self, utterance_id):
+        """Cancel the speculation started for `utterance_id`, e.g. when its transcript is dropped."""
+        with self.lock:
+            spec = self.current
+            if spec is None or utterance_id is None or spec.utterance_id != utterance_id:
+                return False
+            self.current = None
+            self.discard(spec)
+            return True
+
+
+    def claim(self, question, utterance_id=None):
+        """Return the speculation if it answers `question`, otherwise cancel it and return None.
+
+        A speculation started for a later utterance than `utterance_id` is left running for its own question.
+        """
+        with self.lock:
+            spec = self.current
+            if spec is None:
+                return None
+            if utterance_id is not None and spec.utterance_id is not None and spec.utterance_id > utterance_id:
+                return None
+            self.current = None
+            normalized = normalize_question(question)
+            if (spec.error is None and symbol_terms(normalized) == symbol_terms(spec.normalized)
+                    and similarity(normalized, spec.normalized) >= self.match_threshold):
+                self.committed += 1
+                self.saved_seconds += time.time() - spec.started
+                return spec
+            self.discard(spec)
+            return None
+
+
+    def stats(self):
+        return {
+            "started": self.started,
+            "committed": self.committed,
+            "wasted": self.wasted,
+            "wasted_tokens": self.wasted_tokens,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "avg_saved_seconds": round(self.saved_seconds / self.committed, 3) if self.committed else 0.0,
+        }
@@ -0,0 +1,42 @@
+from answer_cache import AnswerCache, normalize_question
+
+
+def test_normalize_folds_case_punctuation_and_disfluencies():
+    assert normalize_question("Um, what is a  closure?") == "what is a closure"
+    assert normalize_question("So, uh, you know, what is a closure") == "so what is a closure"
+
+
+def test_normalize_keeps_language_symbols():
+    keys = {normalize_question(q) for q in ("What is C++?", "What is C#?", "What is C?")}
+    assert keys == {"what is c++", "what is c#", "what is c"}
+    assert normalize_question("Explain .NET and Node.js.") == "explain .net and node.js"
+
+
+def test_normalize_drops_stray_symbols():
+    assert normalize_question("x + y # z...") == "x y z"
+
+
+def test_normalize_keeps_meaningful_words():
+    assert normalize_question("How well does it scale?") != normalize_question("How does it scale?")
+    assert normalize_question("Just how big is it?") != normalize_question("How big is it?")
+
+
+def test_get_matches_rephrased_question():
+    cache = AnswerCache()
+    cache.put("What is a closure?", "A function with its environment.", "model")
+    assert cache.get("um, what is a closure", "model") == "A function with its environment."
+    assert cache.get("What is a closure?", "other model") is None
+
+
+def test_similar_match_requires_same_symbols():
+    cache = AnswerCache(similarity_threshold=0.5)
+    cache.put("What is the difference between C++ and Java in memory management?", "C++ answer")
+    assert cache.get("What is the difference between C# and Java in memory management?") is None
+    assert cache.get("What's the difference between C++ and Java in memory management?") == "C++ answer"
+
+
+def test_persists_and_reloads(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    AnswerCache(path).put("What is C#?", "A language.")
+    assert AnswerCache(path).get("what is c#") == "A language."
+    assert AnswerCache(path).get("what is c") is None
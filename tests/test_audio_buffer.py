@@ -0,0 +1,47 @@
+from audio_buffer import AudioRingBuffer
+
+
+def test_segment_is_contiguous_across_the_wrap():
+    ring = AudioRingBuffer(8, frame_width=2)
+    ring.write(b"abcdef")
+    ring.open_segment(4)
+    ring.write(b"ghij")
+    ring.extend_segment()
+    assert bytes(ring.segment()) == b"efghij"
+    assert ring.segment_length() == 6
+
+
+def test_pre_roll_reaches_back_but_not_past_overwritten_audio():
+    ring = AudioRingBuffer(8, frame_width=2)
+    ring.write(b"0123456789")
+    ring.open_segment(8, pre_roll=4)
+    assert ring.segment_start == 4
+    ring.open_segment(10, pre_roll=100)
+    assert ring.segment_start == 2  # The oldest audio still in the ring
+
+
+def test_offsets_are_aligned_to_frames():
+    ring = AudioRingBuffer(16, frame_width=4)
+    ring.write(b"x" * 12)
+    ring.open_segment(5)
+    ring.extend_segment(11)
+    assert (ring.segment_start, ring.segment_end) == (4, 8)
+
+
+def test_open_segment_follows_the_ring_when_overwritten():
+    ring = AudioRingBuffer(8, frame_width=2)
+    ring.write(b"abcd")
+    ring.open_segment(0)
+    ring.write(b"efghijkl")
+    ring.extend_segment()
+    assert bytes(ring.segment()) == b"efghijkl"
+
+
+def test_tail_and_clear():
+    ring = AudioRingBuffer(8, frame_width=2)
+    ring.write(b"abcdefghij")
+    assert bytes(ring.tail(4)) == b"ghij"
+    ring.open_segment(8)
+    ring.clear_segment()
+    assert ring.segment_length() == 0
+    assert bytes(ring.segment()) == b""
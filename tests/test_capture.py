@@ -0,0 +1,140 @@
+import time
+import numpy as np
+import pytest
+from capture import DeviceCatalog, DeviceNotFound, OwnVoiceMonitor
+from vad import VoiceActivityDetector
+
+RATE = 16000
+CHUNK = 0.1  # Seconds of audio per captured mic chunk
+
+
+def tone(seconds, amplitude=8000, frequency=220):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16).tobytes()
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.int16).tobytes()
+
+
+class FakeFrames:
+    """Stand-in for the mic StageQueue: hands out scripted batches, then an empty one."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+
+    def get_batch(self, max_batch):
+        return self.batches.pop(0) if self.batches else []
+
+
+def test_run_maps_vad_events_onto_chunks():
+    vad = VoiceActivityDetector(RATE, 1, 160, threshold=300, onset_duration=0.02, hangover_duration=0.05)
+    monitor = OwnVoiceMonitor(vad)
+    start = time.time()
+    chunks = [silence(CHUNK)] * 3 + [tone(CHUNK)] * 4 + [silence(CHUNK)] * 3
+    batch = [(start + i * CHUNK, chunk) for i, chunk in enumerate(chunks)]
+    monitor.run(FakeFrames(batch[:5], batch[5:]), max_batch=5)
+    assert monitor.times == [captured_at for captured_at, _ in batch]
+    # A chunk counts as speech when the event falls inside it; the chunks at the edges depend on rounding
+    assert monitor.speech[:2] == [False, False]
+    assert monitor.speech[3:7] == [True] * 4
+    assert monitor.speech[8:] == [False, False]
+
+
+def monitor_with(pattern, start, dominance=0.6):
+    """Monitor whose mic chunks follow `pattern` ("s" speech, "." silence), one every CHUNK seconds from `start`."""
+    monitor = OwnVoiceMonitor(VoiceActivityDetector(RATE, 1, 160, threshold=300), dominance=dominance)
+    monitor.times = [start + i * CHUNK for i in range(len(pattern))]
+    monitor.speech = [c == "s" for c in pattern]
+    return monitor
+
+
+def test_share_and_own_voice_threshold():
+    start = time.time()
+    monitor = monitor_with("...ssss...", start)
+    assert monitor.share(start + 0.25, start + 0.65) == 1.0
+    assert monitor.share(start - 0.05, start + 0.95) == 0.4
+    assert monitor.share(start + 5, start + 6) is None  # No mic audio there
+    assert monitor.is_own_voice(start + 0.25, start + 0.75)  # 4 of 5 chunks
+    assert monitor.is_own_voice(start + 0.15, start + 0.65)  # 4 of 5 chunks, 0.8 >= 0.6
+    assert not monitor.is_own_voice(start + 0.05, start + 0.45)  # 2 of 4 chunks
+    assert not monitor.is_own_voice(start + 5, start + 6)
+    assert monitor.stats() == {"suppressed": 2, "passed": 2}
+
+
+def test_speaking_waits_for_a_lagging_mic_and_gives_up_on_a_stalled_one():
+    start = time.time()
+    monitor = monitor_with("..ss", start)
+    latest = start + 0.3
+    assert monitor.speaking(start + 0.05) is False
+    assert monitor.speaking(latest + 0.05) is True  # Within `lag` of the last chunk
+    assert monitor.speaking(latest + 0.5) is None  # Mic not analysed that far yet
+    assert monitor.speaking(latest + 2.0) is False  # Nothing for `stall` seconds
+
+
+def test_speaking_is_unknown_before_the_first_mic_chunk():
+    vad = VoiceActivityDetector(RATE, 1, 160, threshold=300)
+    monitor = OwnVoiceMonitor(vad)
+    assert monitor.speaking(monitor.started + 0.5) is None
+    assert monitor.speaking(monitor.started + 2.0) is False
+
+
+
+class FakeStream:
+    def __init__(self, device_index):
+        self.device_index = device_index
+        self.closed = False
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAudio:
+    """Stand-in for pyaudio.PyAudio over a fixed device list."""
+
+    def __init__(self, names):
+        self.devices = [{"name": name, "maxInputChannels": 0 if name.startswith("Speakers") else 2} for name in names]
+        self.terminated = False
+
+    def get_device_count(self):
+        return len(self.devices)
+
+    def get_device_info_by_index(self, index):
+        return self.devices[index]
+
+    def open(self, input=False, input_device_index=None, **kwargs):
+        return FakeStream(input_device_index)
+
+    def terminate(self):
+        self.terminated = True
+
+
+def test_open_finds_input_devices_by_name():
+    catalog = DeviceCatalog(FakeAudio(["Speakers", "Built-in Microphone", "BlackHole 2ch"]))
+    stream, info = catalog.open("BlackHole")
+    assert stream.device_index == 2
+    assert info["name"] == "BlackHole 2ch"
+    with pytest.raises(DeviceNotFound):
+        catalog.open("Speakers")  # Output only
+
+
+def test_rescan_waits_for_every_stream_to_close():
+    old_audio = FakeAudio(["Built-in Microphone", "BlackHole 2ch"])
+    catalog = DeviceCatalog(old_audio, create_audio=lambda: FakeAudio(["USB Headset", "Built-in Microphone", "BlackHole 2ch"]))
+    mic, _ = catalog.open("Built-in Microphone")
+    loopback, _ = catalog.open("BlackHole")
+
+    catalog.request_rescan()
+    catalog.close(loopback)
+    assert catalog.open("BlackHole") == (None, None)  # The mic stream still holds the old PortAudio instance
+    assert catalog.rescans == 0 and not old_audio.terminated
+
+    catalog.close(mic)
+    stream, info = catalog.open("BlackHole")
+    assert old_audio.terminated
+    assert catalog.rescans == 1
+    assert stream.device_index == 2  # Index in the re-enumerated list
+    assert catalog.find("USB Headset") is not None
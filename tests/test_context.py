@@ -0,0 +1,87 @@
+import time
+from context import ConversationContext, is_follow_up
+
+
+def test_follow_up_questions():
+    assert is_follow_up("How does it scale?")
+    assert is_follow_up("Why?")
+    assert is_follow_up("And what about Go?")
+    assert not is_follow_up("What is the difference between a process and a thread?")
+    assert not is_follow_up("How would you design a URL shortener?")
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def add_turns(context, indexes, words=10):
+    for index in indexes:
+        context.add_turn(index, f"question {index}", " ".join(["word"] * words))
+
+
+def test_over_budget_folds_oldest_turns_down_to_half_the_budget():
+    folded = []
+
+    def summarize(summary, turns, limit):
+        folded.append([question for question, _ in turns])
+        return "summary"
+
+    context = ConversationContext(summarize, token_budget=50, count_tokens=count_words)
+    add_turns(context, range(5))  # 12 tokens per turn: the fifth turn goes over budget
+    assert wait_for(lambda: context.stats()["folds"] == 1)
+    assert folded == [["question 0", "question 1", "question 2"]]
+    stats = context.stats()
+    assert stats["window_tokens"] <= 25
+    assert stats["summarized_through"] == 2
+    assert context.messages()[0] == {"role": "system", "content": "Summary of the interview so far: summary"}
+
+
+def test_failed_summary_is_retried_on_the_next_turn():
+    attempts = []
+
+    def summarize(summary, turns, limit):
+        attempts.append(len(turns))
+        if len(attempts) == 1:
+            raise ConnectionError("summary request failed")
+        return "summary"
+
+    context = ConversationContext(summarize, token_budget=50, count_tokens=count_words)
+    add_turns(context, range(5))
+    assert wait_for(lambda: len(attempts) == 1 and not context.summarizing)
+    assert context.stats()["folds"] == 0
+    assert context.stats()["turns"] == 5
+    add_turns(context, [5])
+    assert wait_for(lambda: context.stats()["folds"] == 1)
+    assert len(attempts) == 2
+
+
+def test_messages_leave_out_later_slots():
+    context = ConversationContext(lambda *args: "", token_budget=1000, count_tokens=count_words)
+    add_turns(context, [0, 1, 2], words=2)
+    questions = [message["content"] for message in context.messages(2) if message["role"] == "user"]
+    assert questions == ["question 0", "question 1"]
+    assert len(context.messages()) == 6
+
+
+def test_regenerated_answer_for_a_summarized_slot_is_dropped():
+    context = ConversationContext(lambda *args: "summary", token_budget=50, count_tokens=count_words)
+    add_turns(context, range(5))
+    assert wait_for(lambda: context.stats()["folds"] == 1)
+    context.add_turn(0, "question 0", "regenerated")
+    assert all(message["content"] != "regenerated" for message in context.messages())
+
+
+def test_messages_are_capped_while_a_summary_lags():
+    context = ConversationContext(lambda *args: None, token_budget=20, count_tokens=count_words)
+    context.summarizing = True  # A fold is in flight and has not caught up
+    add_turns(context, range(10))
+    messages = context.messages()
+    assert sum(count_words(message["content"]) for message in messages) <= 40
+    assert messages[-2]["content"] == "question 9"
@@ -0,0 +1,80 @@
+import time
+import threading
+import pytest
+from hedging import HedgedCaller, DeadlineExceeded
+
+
+def test_returns_primary_result():
+    caller = HedgedCaller("test", ("remote", lambda x: x * 2), deadline=1.0, hedge=False)
+    result = caller.call(21)
+    assert (result.value, result.backend, result.attempts, result.hedged) == (42, "remote", 1, False)
+
+
+def test_retries_a_failed_request():
+    calls = []
+
+    def flaky(x):
+        calls.append(x)
+        if len(calls) == 1:
+            raise ConnectionError("reset")
+        return x
+
+    caller = HedgedCaller("test", ("remote", flaky), deadline=1.0, retries=1, backoff=0.01, hedge=False)
+    assert caller.call("ok").value == "ok"
+    assert caller.stats()["retries"] == 1
+
+
+def test_raises_when_retries_are_exhausted():
+    def broken(x):
+        raise ConnectionError("down")
+
+    caller = HedgedCaller("test", ("remote", broken), deadline=1.0, retries=1, backoff=0.01, hedge=False)
+    with pytest.raises(ConnectionError):
+        caller.call("x")
+
+
+def test_hedges_a_slow_request():
+    first = threading.Event()
+
+    def slow_once(x):
+        if not first.is_set():
+            first.set()
+            time.sleep(0.5)
+        return x
+
+    # Without latency samples the hedge fires at half the deadline
+    caller = HedgedCaller("test", ("remote", slow_once), deadline=0.2, timeout=2.0, min_hedge_delay=0.05)
+    result = caller.call("x")
+    assert result.hedged
+    assert result.duration < 0.4
+
+
+def test_falls_back_after_the_deadline():
+    caller = HedgedCaller("test", ("remote", lambda x: time.sleep(0.5) or "remote"), ("local", lambda x: "local"),
+                          deadline=0.05, hedge=False)
+    result = caller.call("x")
+    assert result.backend == "local"
+    assert caller.stats()["deadline_misses"] == 1
+
+
+def test_keeps_waiting_past_the_deadline_without_fallback():
+    caller = HedgedCaller("test", ("remote", lambda x: time.sleep(0.2) or "late"), deadline=0.05, timeout=2.0, hedge=False)
+    assert caller.call("x").value == "late"
+    assert caller.stats()["deadline_misses"] == 1
+
+
+def test_gives_up_after_the_timeout():
+    caller = HedgedCaller("test", ("remote", lambda x: time.sleep(1.0)), deadline=0.05, timeout=0.2, hedge=False)
+    with pytest.raises(DeadlineExceeded):
+        caller.call("x")
+
+
+def test_stream_yields_every_token_of_the_winner():
+    def tokens(question):
+        yield "a"
+        yield "b"
+
+    caller = HedgedCaller("test", ("remote", tokens), deadline=1.0, hedge=False)
+    stream = caller.stream("q")
+    assert list(stream) == ["a", "b"]
+    assert stream.backend == "remote"
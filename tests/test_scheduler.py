@@ -0,0 +1,66 @@
+from scheduler import AnswerJob, AnswerQueue
+
+
+def drain(queue):
+    jobs = []
+    while len(queue):
+        job = queue.get(timeout=0)
+        jobs.append(job.index)
+        queue.done(job)
+    return jobs
+
+
+def test_newest_question_first():
+    queue = AnswerQueue(10)
+    for index in range(3):
+        queue.put(AnswerJob(index, f"question {index}"))
+    assert drain(queue) == [2, 1, 0]
+
+
+def test_prioritized_question_jumps_the_queue():
+    queue = AnswerQueue(10)
+    for index in range(3):
+        queue.put(AnswerJob(index, f"question {index}"))
+    assert queue.prioritize(0)
+    assert drain(queue) == [0, 2, 1]
+
+
+def test_stale_jobs_are_cancelled():
+    skipped = []
+    queue = AnswerQueue(10, stale_after=2, on_cancel=skipped.append)
+    running = AnswerJob(0, "question 0")
+    queue.put(running)
+    assert queue.get(timeout=0) is running
+    queue.put(AnswerJob(1, "question 1"))
+    queue.put(AnswerJob(2, "question 2"))
+    assert not running.cancelled.is_set()
+    queue.put(AnswerJob(3, "question 3"))
+    assert running.cancelled.is_set() and not running.superseded
+    queue.put(AnswerJob(4, "question 4"))
+    assert [job.index for job in skipped] == [1]
+    assert drain(queue) == [4, 3, 2]
+
+
+def test_new_job_for_same_slot_supersedes_the_running_one():
+    skipped = []
+    queue = AnswerQueue(10, on_cancel=skipped.append)
+    first = AnswerJob(0, "question")
+    queue.put(first)
+    queue.get(timeout=0)
+    queue.put(AnswerJob(0, "question", priority=1, use_cache=False))
+    assert first.cancelled.is_set() and first.superseded
+    assert skipped == []  # Superseded jobs are not reported as skipped
+
+
+def test_overflow_drops_the_least_wanted_job():
+    queue = AnswerQueue(2)
+    for index in range(3):
+        queue.put(AnswerJob(index, f"question {index}"))
+    assert queue.stats()["dropped"] == 1
+    assert drain(queue) == [2, 1]
+
+
+def test_get_returns_none_once_closed():
+    queue = AnswerQueue(2)
+    queue.close()
+    assert queue.get(timeout=1) is None
@@ -0,0 +1,48 @@
+import time
+from search_index import SearchIndex
+
+
+def indexed(documents):
+    index = SearchIndex()
+    for slot, (question, answer) in enumerate(documents):
+        index.add(slot, "question", question)
+        index.add(slot, "answer", answer)
+    deadline = time.time() + 2
+    while index.stats()["indexed"] < 2 * len(documents) and time.time() < deadline:
+        time.sleep(0.01)
+    return index
+
+
+DOCUMENTS = [
+    ("What is a closure?", "A function that captures variables from its scope."),
+    ("How does garbage collection work?", "Reference counting plus a cycle collector."),
+    ("Explain Python generators", "Functions that yield values lazily, like a closure over their frame."),
+]
+
+
+def test_ranks_question_matches_above_answer_matches():
+    index = indexed(DOCUMENTS)
+    slots = [slot for slot, _ in index.search("closure ")]
+    assert slots == [0, 2]
+
+
+def test_last_word_is_a_prefix_while_typing():
+    index = indexed(DOCUMENTS)
+    assert [slot for slot, _ in index.search("garb")] == [1]
+    assert index.search("garb ") == []  # A finished word must match exactly
+
+
+def test_replacing_a_field_removes_its_old_terms():
+    index = indexed(DOCUMENTS)
+    index.add(1, "answer", "Mark and sweep.")
+    deadline = time.time() + 2
+    while index.stats()["indexed"] < 7 and time.time() < deadline:
+        time.sleep(0.01)
+    assert index.search("cycle ") == []
+    assert [slot for slot, _ in index.search("sweep")] == [1]
+
+
+def test_empty_query_and_limit():
+    index = indexed(DOCUMENTS)
+    assert index.search("  ") == []
+    assert len(index.search("a", limit=1)) == 1
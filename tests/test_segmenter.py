@@ -0,0 +1,37 @@
+from segmenter import Segmenter
+from test_vad import RATE, CHUNK, tone, silence
+
+
+def segmenter(max_segment_duration=60):
+    return Segmenter(RATE, 1, CHUNK, 300, pre_roll_duration=0.1, max_segment_duration=max_segment_duration,
+                     block_frames=10, hangover_duration=0.2)
+
+
+def run(seg, audio, block=CHUNK * 2 * 10):
+    events = []
+    for position in range(0, len(audio), block):
+        events += [(event, at, None if segment is None else bytes(segment))
+                   for event, at, segment in seg.process(audio[position:position + block])]
+    return events
+
+
+def test_segment_includes_pre_roll():
+    events = run(segmenter(), silence(0.5) + tone(1.0) + silence(0.5))
+    assert [event for event, _, _ in events] == ["start", "end"]
+    segment = events[1][2]
+    assert abs(len(segment) / (2 * RATE) - 1.1) < 0.02  # One second of speech plus 0.1 s pre-roll
+
+
+def test_long_speech_is_flushed():
+    seg = segmenter(max_segment_duration=0.5)
+    events = run(seg, silence(0.2) + tone(1.2))
+    assert [event for event, _, _ in events] == ["start", "flush", "flush"]
+    assert all(len(segment) >= RATE for _, _, segment in events[1:])
+    remainder = seg.finish()
+    assert remainder is not None and len(remainder) > 0
+
+
+def test_finish_without_open_segment():
+    seg = segmenter()
+    run(seg, silence(0.5))
+    assert seg.finish() is None
@@ -0,0 +1,78 @@
+import os
+from session_store import SessionStore
+
+
+def test_reopens_a_session_that_was_not_closed(tmp_path):
+    store = SessionStore.open_latest(str(tmp_path))
+    store.add_question("What is a closure?")
+    store.set_answer(0, "A function with its environment.")
+    store.save_answer(0)
+
+    reopened = SessionStore.open_latest(str(tmp_path))
+    assert reopened.path == store.path
+    assert reopened.get(0) == ("What is a closure?", "A function with its environment.")
+
+
+def test_clean_close_starts_a_new_session(tmp_path):
+    store = SessionStore.open_latest(str(tmp_path))
+    store.add_question("What is a closure?")
+    store.close()
+    assert os.path.exists(store.closed_path)
+
+    assert len(SessionStore.open_latest(str(tmp_path))) == 0
+
+
+def test_save_after_close_is_ignored(tmp_path):
+    store = SessionStore(str(tmp_path / "session-1.jsonl"))
+    store.add_question("What is a closure?")
+    store.close()
+    store.set_answer(0, "late answer")
+    store.save_answer(0)
+    assert store.stats()["slots"] == 1
+
+
+def filled_store(path, count, window=200):
+    store = SessionStore(str(path), window=window)
+    for slot in range(count):
+        store.add_question(f"question {slot}")
+        store.set_answer(slot, f"answer {slot}")
+        store.save_answer(slot)
+    return store
+
+
+def test_recovers_from_a_torn_journal_tail(tmp_path):
+    path = tmp_path / "session-1.jsonl"
+    filled_store(path, 3)
+    with open(path, "ab") as f:
+        f.write(b'{"i": 3, "q": "half a li')
+    store = SessionStore(str(path))
+    assert len(store) == 3
+    assert store.add_question("question 3") == 3
+    assert SessionStore(str(path)).get(3) == ("question 3", "")
+
+
+def test_rebuilds_a_missing_index(tmp_path):
+    path = tmp_path / "session-1.jsonl"
+    filled_store(path, 5)
+    os.remove(tmp_path / "session-1.idx")
+    store = SessionStore(str(path))
+    assert len(store) == 5
+    assert store.get(4) == ("question 4", "answer 4")
+
+
+def test_indexes_journal_records_written_after_the_index(tmp_path):
+    path = tmp_path / "session-1.jsonl"
+    filled_store(path, 2)
+    with open(path, "ab") as f:
+        f.write(b'{"i": 1, "a": "better answer 1", "ts": 0}\n{"i": 2, "q": "question 2", "ts": 0}\n')
+    store = SessionStore(str(path))
+    assert len(store) == 3
+    assert store.get(1) == ("question 1", "better answer 1")
+    assert store.get(2) == ("question 2", "")
+
+
+def test_keeps_only_the_window_in_memory_and_pages_older_slots(tmp_path):
+    store = filled_store(tmp_path / "session-1.jsonl", 10, window=3)
+    assert store.stats()["in_memory"] == 3
+    assert store.page(2, 2) == [(0, "question 0", "answer 0"), (1, "question 1", "answer 1")]
+    assert list(store.questions)[-1] == "question 9"
@@ -0,0 +1,54 @@
+import time
+from speculation import Speculator
+
+
+def stream_answer(question):
+    yield "answer to "
+    yield question
+
+
+def test_speculates_once_interim_is_stable_without_another_interim():
+    speculator = Speculator(stream_answer, stable_duration=0.05)
+    speculator.observe_interim("What is a closure", utterance_id=1)
+    time.sleep(0.2)
+    assert speculator.stats()["started"] == 1
+    spec = speculator.claim("What is a closure?", utterance_id=1)
+    assert spec is not None
+    assert "".join(spec.follow()) == "answer to What is a closure"
+
+
+def test_changing_interim_restarts_the_timer():
+    speculator = Speculator(stream_answer, stable_duration=0.1)
+    speculator.observe_interim("What is", utterance_id=1)
+    time.sleep(0.06)
+    speculator.observe_interim("What is a closure", utterance_id=1)
+    time.sleep(0.06)
+    assert speculator.stats()["started"] == 0
+    time.sleep(0.15)
+    assert speculator.stats()["started"] == 1
+
+
+def test_claim_keeps_speculation_for_newer_utterance():
+    speculator = Speculator(stream_answer)
+    speculator.speculate("What is a monad", utterance_id=2)
+    assert speculator.claim("What is a closure?", utterance_id=1) is None
+    assert speculator.stats()["wasted"] == 0
+    assert speculator.claim("What is a monad?", utterance_id=2) is not None
+
+
+def test_claim_discards_mismatched_speculation():
+    speculator = Speculator(stream_answer)
+    speculator.speculate("What is C++", utterance_id=1)
+    assert speculator.claim("What is C#", utterance_id=1) is None
+    assert speculator.stats()["wasted"] == 1
+
+
+def test_drop_cancels_only_the_matching_utterance():
+    speculator = Speculator(stream_answer)
+    speculator.speculate("What is a closure", utterance_id=2)
+    assert not speculator.drop(1)
+    spec = speculator.current
+    assert speculator.drop(2)
+    assert spec.cancelled.is_set()
+    assert speculator.current is None
+    assert speculator.stats()["wasted"] == 1
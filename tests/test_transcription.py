@@ -0,0 +1,57 @@
+from transcription import StreamingSession, FakeSpeechClient
+
+
+def start_session(client):
+    interims, finals = [], []
+    streaming_config, make_request = FakeSpeechClient.streaming_config()
+    session = StreamingSession(client, streaming_config, make_request, on_interim=interims.append, on_final=finals.append)
+    return session.start(), interims, finals
+
+
+def test_streams_interims_then_final():
+    session, interims, finals = start_session(FakeSpeechClient(["what is a closure"]))
+    for _ in range(4):
+        session.feed(b"\0" * 320)
+    assert session.finish(timeout=2) == "what is a closure"
+    assert interims[0] == "what"
+    assert interims[-1] == "what is a closure"
+    assert finals == ["what is a closure"]
+    assert session.error is None
+
+
+def test_feed_after_done_is_ignored():
+    session, _, finals = start_session(FakeSpeechClient(["hello"]))
+    session.finish(timeout=2)
+    session.feed(b"\0" * 320)
+    assert b"\0" * 320 not in list(session.requests.queue)
+    assert finals == ["hello"]
+
+
+class FailingClient:
+    def streaming_recognize(self, config, requests):
+        raise ConnectionError("stream reset")
+
+
+def test_error_is_recorded_without_a_final():
+    session, _, finals = start_session(FailingClient())
+    session.finish(timeout=2)
+    assert isinstance(session.error, ConnectionError)
+    assert finals == []
+
+
+def test_abandoned_session_never_delivers_its_late_final():
+    session, _, finals = start_session(FakeSpeechClient(["streamed question"], latency=0.5))
+    session.feed(b"\0" * 320)
+    assert session.finish(timeout=0.1) is None  # Timed out, the caller falls back to batch recognition
+    assert session.abandon()
+    assert session.done.wait(2)
+    assert finals == []
+
+
+def test_abandon_after_delivery_reports_it():
+    session, _, finals = start_session(FakeSpeechClient(["streamed question"]))
+    session.feed(b"\0" * 320)
+    session.finish(timeout=2)
+    session.thread.join(2)
+    assert not session.abandon()
+    assert finals == ["streamed question"]
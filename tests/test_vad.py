@@ -0,0 +1,49 @@
+import numpy as np
+from vad import VoiceActivityDetector
+
+RATE = 16000
+CHUNK = 160  # 10 ms frames
+
+
+def tone(seconds, amplitude=8000, frequency=220):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16).tobytes()
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.int16).tobytes()
+
+
+def detector():
+    return VoiceActivityDetector(RATE, 1, CHUNK, threshold=300, onset_duration=0.05, hangover_duration=0.2)
+
+
+def test_detects_start_and_end_of_speech():
+    vad = detector()
+    events = vad.process(silence(0.5) + tone(1.0) + silence(0.5))
+    assert [event for event, _ in events] == ["start", "end"]
+    start, end = events[0][1], events[1][1]
+    assert abs(start - 0.5) < 0.02
+    assert abs(end - 1.5) < 0.02
+    assert not vad.in_speech
+
+
+def test_events_do_not_depend_on_block_size():
+    audio = silence(0.3) + tone(0.6) + silence(0.4)
+    whole = detector().process(audio)
+    vad = detector()
+    pieces = []
+    for position in range(0, len(audio), 1234):  # Not a multiple of the frame size
+        pieces += vad.process(audio[position:position + 1234])
+    assert pieces == whole
+    assert abs(vad.time - 1.3) < 0.011
+
+
+def test_short_click_is_not_speech():
+    vad = detector()
+    assert vad.process(silence(0.3) + tone(0.02) + silence(0.3)) == []
+
+
+def test_quiet_signal_below_threshold_is_not_speech():
+    vad = detector()
+    assert vad.process(silence(0.3) + tone(1.0, amplitude=100) + silence(0.3)) == []
@@ -0,0 +1,125 @@
+import json
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+
+class NullSpan:
+    """Shared no-op span returned while tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        return False
+
+
+
+NULL_SPAN = NullSpan()
+
+
+
+class Span:
+    def __init__(self, tracer, name, utterance_id, export, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.utterance_id = utterance_id
+        self.export = export
+        self.attrs = attrs
+
+
+    def __enter__(self):
+        self.start = time.time()
+        self.started = time.perf_counter()
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = repr(exc)
+        self.tracer.record(self.name, time.perf_counter() - self.started, self.utterance_id,
+                           start=self.start, export=self.export, **self.attrs)
+        return False
+
+
+
+class Tracer:
+    """Per-utterance stage timing with rolling statistics and a rotating JSONL export.
+
+    When disabled, `span` returns a shared no-op context manager and `record`
+    returns immediately, so instrumented code pays one attribute check.
+    File writes happen on a background listener thread, never on the caller's.
+    """
+
+    def __init__(self, enabled=False, path=None, max_bytes=5 * 1024 * 1024, backup_count=3, window=50):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}  # Stage name -> deque of recent durations in seconds
+        self.lock = threading.Lock()
+        self.utterance_ids = itertools.count(1)
+        self.listener = None
+        self.logger = None
+        if enabled and path:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            records = queue.Queue()
+            self.listener = QueueListener(records, handler)
+            self.listener.start()
+            self.logger = logging.getLogger("interview_assistant.trace")
+            self.logger.propagate = False
+            self.logger.setLevel(logging.INFO)
+            self.logger.addHandler(QueueHandler(records))
+
+
+    def new_utterance_id(self):
+        return next(self.utterance_ids)
+
+
+    def span(self, name, utterance_id=None, export=True, **attrs):
+        """Time a block as stage `name`; per-frame stages pass export=False to only feed the rolling stats."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, utterance_id, export, attrs)
+
+
+    def record(self, name, duration, utterance_id=None, start=None, export=True, **attrs):
+        """Record a stage duration measured elsewhere (e.g. between two timestamps)."""
+        if not self.enabled:
+            return
+        with self.lock:
+            samples = self.stages.get(name)
+            if samples is None:
+                samples = self.stages[name] = deque(maxlen=self.window)
+            samples.append(duration)
+        if export and self.logger:
+            event = {"utterance": utterance_id, "stage": name, "start": start, "duration": round(duration, 6)}
+            event.update(attrs)
+            self.logger.info(json.dumps(event, default=str))
+
+
+    def rolling_stats(self):
+        """Recent p50/p95/last duration in milliseconds for every stage seen so far."""
+        with self.lock:
+            snapshot = {name: sorted(samples) for name, samples in self.stages.items()}
+            last = {name: samples[-1] for name, samples in self.stages.items()}
+        return {
+            name: {
+                "p50": 1000 * samples[len(samples) // 2],
+                "p95": 1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                "last": 1000 * last[name],
+                "count": len(samples),
+            }
+            for name, samples in snapshot.items()
+        }
+
+
+    def close(self):
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
@@ -0,0 +1,203 @@
+import time
+import queue
+import threading
+from types import SimpleNamespace
+
+
+
+def create_speech_client(service_account_key):
+    """Build a Speech-to-Text client, importing the Google client library on first use."""
+    from google.cloud import speech
+    return speech.SpeechClient.from_service_account_json(service_account_key)
+
+
+def warm_up_speech_client(speech_client, timeout=10.0):
+    """Open the client's gRPC channel ahead of the first request without making a billable call.
+
+    Every later recognize/streaming_recognize call is multiplexed over this channel.
+    Returns False for clients without a gRPC transport (e.g. FakeSpeechClient).
+    """
+    channel = getattr(getattr(speech_client, "transport", None), "grpc_channel", None)
+    if channel is None:
+        return False
+    import grpc
+    grpc.channel_ready_future(channel).result(timeout=timeout)
+    return True
+
+
+
+class LocalWhisperTranscriber:
+    """Offline recognition with faster-whisper, used as the fallback Speech-to-Text backend.
+
+    The model is loaded on first use (or ahead of time with `load`).
+    """
+
+    def __init__(self, model_size="base.en", device="cpu", compute_type="int8"):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.model = None
+        self.lock = threading.Lock()
+
+
+    def load(self):
+        with self.lock:
+            if self.model is None:
+                from faster_whisper import WhisperModel
+                self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+        return self.model
+
+
+    def transcribe(self, samples):
+        """Transcribe mono int16 samples at 16 kHz."""
+        segments, _ = self.load().transcribe(samples.astype("float32") / 32768.0, language="en", beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+
+class StreamingSession:
+    """Stream one utterance to the recognizer while it is still being spoken."""
+
+    def __init__(self, speech_client, streaming_config, make_request, on_interim=None, on_final=None):
+        self.speech_client = speech_client
+        self.streaming_config = streaming_config
+        self.make_request = make_request
+        self.on_interim = on_interim
+        self.on_final = on_final
+        self.requests = queue.Queue()
+        self.finals = []
+        self.transcript = None
+        self.error = None
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.abandoned = False
+        self.delivered = False  # on_final has been (or is being) called
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+
+    def start(self):
+        self.thread.start()
+        return self
+
+
+    def feed(self, audio_data):
+        """Queue a block of PCM audio for the open recognition stream."""
+        if not self.done.is_set():
+            self.requests.put(audio_data)
+
+
+    def finish(self, timeout=None):
+        """Half-close the request stream and wait for the final transcript."""
+        self.requests.put(None)
+        self.done.wait(timeout)
+        return self.transcript
+
+
+    def abandon(self):
+        """Stop delivering results, e.g. once the caller has fallen back to batch recognition.
+
+        Returns False if the final transcript was already handed to `on_final`.
+        """
+        with self.lock:
+            if self.delivered:
+                return False
+            self.abandoned = True
+        self.requests.put(None)
+        return True
+
+
+    def request_generator(self):
+        while True:
+            chunk = self.requests.get()
+            if chunk is None:
+                return
+            yield self.make_request(chunk)
+
+
+    def run(self):
+        try:
+            responses = self.speech_client.streaming_recognize(self.streaming_config, self.request_generator())
+            for response in responses:
+                for result in response.results:
+                    if not result.alternatives:
+                        continue
+                    text = result.alternatives[0].transcript
+                    if result.is_final:
+                        self.finals.append(text.strip())
+                    elif self.on_interim and not self.abandoned:
+                        self.on_interim(" ".join(self.finals + [text.strip()]))
+        except Exception as e:
+            print(f"Streaming recognition error: {e}")
+            self.error = e
+        finally:
+            self.transcript = " ".join(self.finals).strip()
+            self.requests.put(None)  # Unblock the request generator if the server closed first
+            self.done.set()
+
+        with self.lock:
+            self.delivered = self.error is None and not self.abandoned
+        if self.delivered and self.on_final:
+            self.on_final(self.transcript)
+
+
+
+class FakeSpeechClient:
+    """Local stand-in for speech.SpeechClient that replays scripted transcripts.
+
+    `latency` (seconds, or a callable returning seconds) delays each recognize
+    call and the final result of each stream.
+    """
+
+    def __init__(self, transcripts, words_per_request=1, latency=0.0):
+        self.transcripts = list(transcripts)
+        self.words_per_request = words_per_request
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.recognized = {}  # Audio content -> transcript already handed out
+
+
+    @staticmethod
+    def streaming_config():
+        """Stand-in for InterviewAssistant.build_streaming_config: no Google library needed, chunks pass through as requests."""
+        return SimpleNamespace(interim_results=True, single_utterance=True), lambda chunk: chunk
+
+
+    def wait(self):
+        time.sleep(self.latency() if callable(self.latency) else self.latency)
+
+
+    def next_transcript(self):
+        with self.lock:
+            return self.transcripts.pop(0) if self.transcripts else ""
+
+
+    @staticmethod
+    def make_response(text, is_final):
+        alternative = SimpleNamespace(transcript=text, confidence=1.0)
+        result = SimpleNamespace(alternatives=[alternative], is_final=is_final)
+        return SimpleNamespace(results=[result])
+
+
+    def recognize(self, config=None, audio=None, timeout=None):
+        """Return the next scripted transcript; a retried or hedged request for the same audio gets the same one."""
+        self.wait()
+        content = getattr(audio, "content", None)
+        with self.lock:
+            text = self.recognized.get(content) if content is not None else None
+            if text is None:
+                text = self.transcripts.pop(0) if self.transcripts else ""
+                if content is not None:
+                    self.recognized[content] = text
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[SimpleNamespace(transcript=text)])] if text else [])
+
+
+    def streaming_recognize(self, config, requests):
+        """Reveal the scripted transcript a few words per request, then emit the final result."""
+        words = self.next_transcript().split()
+        revealed = 0
+        for _ in requests:
+            if revealed < len(words):
+                revealed += self.words_per_request
+                yield self.make_response(" ".join(words[:revealed]), is_final=False)
+        self.wait()
+        yield self.make_response(" ".join(words), is_final=True)
@@ -1,17 +1,62 @@
+import bisect
+import threading
 import tkinter as tk
 from tkinter import ttk
 
 
 
+class CoalescedUpdater:
+    """Collect item updates from worker threads and render each dirty item at most once per frame on the Tk thread."""
+
+    def __init__(self, root, render, interval_ms=30):
+        self.root = root
+        self.render = render
+        self.interval_ms = interval_ms
+        self.dirty = set()
+        self.scheduled = False
+        self.lock = threading.Lock()
+
+
+    def mark_dirty(self, item_id):
+        with self.lock:
+            self.dirty.add(item_id)
+            if self.scheduled:
+                return
+            self.scheduled = True
+        self.root.after(self.interval_ms, self.flush)
+
+
+    def flush(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            self.scheduled = False
+        for item_id in sorted(dirty):
+            self.render(item_id)
+
+
+
 class InterviewAssistantUI:
-    def __init__(self, root, on_question_select, start_recording):
+    def __init__(self, root, on_question_select, start_recording, on_question_regenerate=None, on_load_older=None, max_items=None, page_size=50, on_search=None):
         self.root = root
         self.root.title("Interview Assistant")
         self.root.geometry("1000x800")
         self.on_question_select = on_question_select
         self.start_recording = start_recording
+        self.on_question_regenerate = on_question_regenerate
+        self.on_load_older = on_load_older  # (before, count) -> [(id, question, answer)] for items scrolled back to
+        self.max_items = max_items  # Items kept in the widgets; older ones are paged back in on scroll
+        self.page_size = page_size
+        self.on_search = on_search  # query -> [(id, question)], best first
+        self.search_hits = []
+        self.first_id = 0  # Oldest item id loaded into the widgets
+        self.loading_older = False
         self.is_recording = False
         self.record_button = None
+        self.question_ids = []  # Item ids on screen, in display order; tags "question_<id>"/"answer_<id>" hold their ranges
+        self.answer_ids = []
+        self.highlighted = None
+        self.questions_rendered = 0
+        self.answers_rendered = 0
         self.setup_ui()
 
 
@@ -21,10 +66,32 @@ class InterviewAssistantUI:
         top_frame.pack(fill=tk.X, padx=10, pady=5)
 
         self.create_record_button(top_frame)
+
+        # Readiness of the speech and answer clients, which connect in the background
+        self.status_label = tk.Label(top_frame, text="Starting...", anchor="e", fg="gray")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+
+        # Search over every question and answer of the session, ranked as you type
+        if self.on_search:
+            self.search_var = tk.StringVar()
+            self.search_entry = tk.Entry(top_frame, textvariable=self.search_var, width=30)
+            self.search_entry.pack(side=tk.RIGHT, padx=5)
+            self.search_var.trace_add("write", lambda *args: self.update_search_results())
+            self.search_entry.bind("<Return>", lambda event: self.select_search_result(0))
+            self.search_entry.bind("<Down>", lambda event: self.search_results.focus_set() if self.search_hits else None)
+            self.search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+            self.search_results = tk.Listbox(self.root, height=8, bg="#2B2C2C", fg="white", borderwidth=0, highlightthickness=0)
+            self.search_results.bind("<<ListboxSelect>>", self.on_search_result_click)
+            self.search_results.bind("<Escape>", lambda event: self.search_var.set(""))
+
+        # Live transcript of the question currently being asked
+        self.interim_label = tk.Label(top_frame, text="", anchor="w", fg="gray")
+        self.interim_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
         # Paned window layout
         paned_window = tk.PanedWindow(self.root, orient=tk.HORIZONTAL)
         paned_window.pack(fill=tk.BOTH, expand=True)
+        self.paned_window = paned_window
         
         # Left frame for questions
         left_frame = tk.Frame(paned_window, width=300)
@@ -47,7 +114,10 @@ class InterviewAssistantUI:
             highlightthickness=0
         )
         self.question_text.pack(fill=tk.BOTH, expand=True)
-        self.question_text.bind("<Button-1>", self.on_question_click)
+        self.question_text.config(yscrollcommand=self.on_scroll)
+        self.question_text.bind("<Button-1>", self.on_question_text_click)
+        self.question_text.bind("<Double-Button-1>", self.on_question_text_double_click)
+        self.question_text.tag_configure("highlight", background="yellow", foreground="black")
 
         # Answer display (right frame)
         self.answer_text = tk.Text(
@@ -61,22 +131,77 @@ class InterviewAssistantUI:
             highlightthickness=0
         )
         self.answer_text.pack(fill=tk.BOTH, expand=True)
+        self.answer_text.config(yscrollcommand=self.on_scroll)
+        self.answer_text.tag_configure("highlight", background="yellow", foreground="black")
         self.answer_text.bind("<Configure>", lambda event: self.ensure_answer_visibility())
+
+        # Performance overlay (F2), fed by the tracer when tracing is enabled
+        self.overlay_label = tk.Label(self.root, text="", anchor="w", justify=tk.LEFT, font=("Courier", 9), bg="black", fg="lime")
+        self.overlay_visible = False
+        self.root.bind("<F2>", lambda event: self.toggle_overlay())
     
     
     def ensure_answer_visibility(self):
         """Ensure the highlighted answer remains visible during window resizing."""
-        if self.question_text.tag_ranges("highlight"):
-            start_index = self.question_text.tag_ranges("highlight")[0]  # Get the start of the highlight tag
-            self.answer_text.see(start_index)  # Scroll to match the question's index
+        if self.highlighted is None or not self.answer_text.tag_ranges(f"answer_{self.highlighted}"):
+            return
+        self.answer_text.see(f"answer_{self.highlighted}.first")
 
         # Ensure full visibility of the last answer if the last question is selected
-        if self.question_text.tag_ranges("highlight"):
-            selected_index = int(self.question_text.index("highlight.first").split(".")[0]) // 2
-            if selected_index == len(self.answer_text.get("1.0", tk.END).splitlines()) - 2:
-                self.answer_text.yview_moveto(1.0)
+        if self.answer_ids and self.highlighted == self.answer_ids[-1]:
+            self.answer_text.yview_moveto(1.0)
+
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self.overlay_label.pack(side=tk.BOTTOM, fill=tk.X, before=self.paned_window)
+        else:
+            self.overlay_label.pack_forget()
+
+
+    def update_search_results(self):
+        """Re-run the search for the current query and list the hits under the search bar."""
+        query = self.search_var.get().strip()
+        self.search_hits = self.on_search(query) if query else []
+        self.search_results.delete(0, tk.END)
+        for item_id, question in self.search_hits:
+            self.search_results.insert(tk.END, f"{item_id + 1}. {question}")
+        if self.search_hits:
+            self.search_results.pack(side=tk.TOP, fill=tk.X, padx=10, before=self.paned_window)
+        else:
+            self.search_results.pack_forget()
+
+
+    def on_search_result_click(self, event):
+        selection = self.search_results.curselection()
+        if selection:
+            self.select_search_result(selection[0])
+
+
+    def select_search_result(self, position):
+        """Jump to a search hit, paging it back into the panes first if it was trimmed."""
+        if position >= len(self.search_hits):
+            return
+        item_id = self.search_hits[position][0]
+        if item_id < self.first_id and self.on_load_older:
+            self.load_older(self.first_id - item_id)
+        self.on_question_select(item_id)
+
+
+    def show_status(self, text, ready=False):
+        self.status_label.config(text=text, fg="green" if ready else "gray")
+
+
+    def show_overlay(self, text):
+        self.overlay_label.config(text=text)
+
+
+    def show_interim(self, text):
+        """Display the interim transcript of the question in progress."""
+        self.interim_label.config(text=text)
+
 
- 
     def scroll_to_end(self):
         """Scroll both the question list and answer text to the end."""
         self.question_text.yview_moveto(1.0)
@@ -108,67 +233,151 @@ class InterviewAssistantUI:
             self.on_question_select(index)
 
 
- 
+    def question_at(self, event):
+        """Resolve a pointer position in the question pane to a question id."""
+        position = self.question_text.index(f"@{event.x},{event.y}")
+        for tag in self.question_text.tag_names(position):
+            if tag.startswith("question_"):
+                return int(tag[len("question_"):])
+        return None
+
+
+    def on_question_text_click(self, event):
+        index = self.question_at(event)
+        if index is not None:
+            self.on_question_select(index)
+
+
+    def on_question_text_double_click(self, event):
+        """Regenerate the double-clicked question's answer without the answer cache."""
+        index = self.question_at(event)
+        if index is not None and self.on_question_regenerate:
+            self.on_question_regenerate(index)
+
+
+    def insert_item(self, widget, ids, prefix, item_id, text):
+        """Insert or replace the text of an item, keeping items in id order. O(log n) in the session length."""
+        tag = f"{prefix}_{item_id}"
+        widget.config(state=tk.NORMAL)
+        if widget.tag_ranges(tag):
+            start = widget.index(f"{tag}.first")
+            widget.delete(start, f"{tag}.last")
+            widget.insert(start, f"{text}\n", tag)
+        else:
+            position = bisect.bisect(ids, item_id)
+            index = widget.index(f"{prefix}_{ids[position]}.first") if position < len(ids) else widget.index("end-1c")
+            widget.insert(index, f"{text}\n", tag, "\n", ())
+            ids.insert(position, item_id)
+        widget.config(state=tk.DISABLED)
+        if item_id == self.highlighted:
+            widget.tag_add("highlight", f"{tag}.first", f"{tag}.last")
+
+
+    def remove_item(self, widget, ids, prefix, item_id):
+        tag = f"{prefix}_{item_id}"
+        if widget.tag_ranges(tag):
+            widget.config(state=tk.NORMAL)
+            widget.delete(f"{tag}.first", f"{tag}.last + 1c")  # Including the blank separator line
+            widget.config(state=tk.DISABLED)
+        position = bisect.bisect_left(ids, item_id)
+        if position < len(ids) and ids[position] == item_id:
+            del ids[position]
+
+
+    def trim_items(self):
+        """Drop the oldest items beyond `max_items` from the widgets, keeping the highlighted one and everything after it."""
+        if not self.max_items or len(self.question_ids) <= self.max_items:
+            return
+        keep_from = self.question_ids[-self.max_items]
+        if self.highlighted is not None:
+            keep_from = min(keep_from, self.highlighted)
+        while self.question_ids and self.question_ids[0] < keep_from:
+            item_id = self.question_ids[0]
+            self.remove_item(self.question_text, self.question_ids, "question", item_id)
+            self.remove_item(self.answer_text, self.answer_ids, "answer", item_id)
+        self.first_id = keep_from
+
+
+    def start_at(self, item_id):
+        """Render only items from `item_id` on (e.g. a resumed session's window); older ones load on scroll-back."""
+        self.first_id = item_id
+        self.questions_rendered = max(self.questions_rendered, item_id)
+        self.answers_rendered = max(self.answers_rendered, item_id)
+
+
+    def on_scroll(self, first, last):
+        """yscrollcommand of both panes: page in older items once the top is reached."""
+        if float(first) <= 0.0 and self.first_id > 0 and self.on_load_older and not self.loading_older:
+            self.loading_older = True
+            self.root.after_idle(self.load_older)
+
+
+    def load_older(self, count=None):
+        try:
+            old_first = self.first_id
+            items = self.on_load_older(old_first, count or self.page_size)
+            if items:
+                self.first_id = items[0][0]
+            for item_id, question, answer in items:
+                self.append_question(item_id, question)
+                self.set_answer(item_id, answer)
+            if items:
+                # Keep the item that was at the top in place instead of jumping to the new oldest one
+                for widget, prefix in ((self.question_text, "question"), (self.answer_text, "answer")):
+                    if widget.tag_ranges(f"{prefix}_{old_first}"):
+                        widget.yview(f"{prefix}_{old_first}.first")
+        finally:
+            self.loading_older = False
+
+
+    def append_question(self, item_id, question):
+        self.insert_item(self.question_text, self.question_ids, "question", item_id, question)
+
+
+    def set_answer(self, item_id, answer):
+        if item_id < self.first_id:
+            return  # Trimmed from the widgets; paged back in with its current text on scroll-back
+        self.insert_item(self.answer_text, self.answer_ids, "answer", item_id, answer)
+
+
     def update_questions_and_answers(self, questions, answers):
-        """Update the UI to display all questions and answers."""
-        self.question_text.config(state=tk.NORMAL)
-        self.answer_text.config(state=tk.NORMAL)
-        self.question_text.delete(1.0, tk.END)
-        self.answer_text.delete(1.0, tk.END)
-
-        # Populate questions in the text widget
-        for i, question in enumerate(questions):
-            tag = f"question_{i}"
-            start = self.question_text.index(tk.END)
-            self.question_text.insert(tk.END, f"{question}\n\n", tag)
-            end = self.question_text.index(tk.END)
-            self.question_text.tag_add(tag, start, end)
-            self.question_text.tag_bind(tag, "<Button-1>", lambda event, index=i: self.on_question_click(event, index))
-
-        # Populate answers in the text widget
-        for answer in answers:
-            self.answer_text.insert(tk.END, f"{answer}\n\n")
-
-        self.question_text.config(state=tk.DISABLED)
-        self.answer_text.config(state=tk.DISABLED)
-
- 
-    def highlight_answer(self, selected_index, answers):
-        """Highlight the selected answer and corresponding question."""
-        # Enable editing temporarily
-        self.answer_text.config(state=tk.NORMAL)
-        self.question_text.config(state=tk.NORMAL)
+        """Append questions and answers that are not on screen yet."""
+        for i in range(self.questions_rendered, len(questions)):
+            self.append_question(i, questions[i])
+        self.questions_rendered = len(questions)
+        for i in range(self.answers_rendered, len(answers)):
+            self.set_answer(i, answers[i])
+        self.answers_rendered = len(answers)
+        self.trim_items()
 
-        # Clear previous highlights
-        self.answer_text.tag_remove("highlight", "1.0", tk.END)
-        self.question_text.tag_remove("highlight", "1.0", tk.END)
+
+    def highlight_answer(self, selected_index, answers):
+        """Highlight the selected answer and corresponding question, touching only the old and new ranges."""
+        if self.highlighted is not None:
+            for widget, tag in ((self.question_text, f"question_{self.highlighted}"), (self.answer_text, f"answer_{self.highlighted}")):
+                if widget.tag_ranges(tag):
+                    widget.tag_remove("highlight", f"{tag}.first", f"{tag}.last")
+        self.highlighted = selected_index
+        if selected_index is None:
+            return
 
         # Highlight the selected question
-        if selected_index is not None:
-            question_start = f"{selected_index * 2 + 1}.0"
-            question_end = f"{selected_index * 2 + 2}.0"
-            self.question_text.tag_add("highlight", question_start, question_end)
-            self.question_text.tag_configure("highlight", background="yellow", foreground="black")
-            self.question_text.see(question_start)
+        question_tag = f"question_{selected_index}"
+        if self.question_text.tag_ranges(question_tag):
+            self.question_text.tag_add("highlight", f"{question_tag}.first", f"{question_tag}.last")
+            self.question_text.see(f"{question_tag}.first")
 
         # Highlight the selected answer
-        for i, answer in enumerate(answers):
-            answer_start = f"{i * 2 + 1}.0"
-            answer_end = f"{i * 2 + 2}.0"
-            if i == selected_index:
-                self.answer_text.tag_add("highlight", answer_start, answer_end)
-                self.answer_text.tag_configure("highlight", background="yellow", foreground="black")
-                self.answer_text.see(answer_start)
-
-                # Ensure full visibility of the last answer when the last question is selected
-                if selected_index == len(answers) - 1:
-                    self.answer_text.yview_moveto(1.0)  # Scroll to the bottom
-
-        # Disable editing again
-        self.answer_text.config(state=tk.DISABLED)
-        self.question_text.config(state=tk.DISABLED)
+        answer_tag = f"answer_{selected_index}"
+        if self.answer_text.tag_ranges(answer_tag):
+            self.answer_text.tag_add("highlight", f"{answer_tag}.first", f"{answer_tag}.last")
+            self.answer_text.see(f"{answer_tag}.first")
+
+            # Ensure full visibility of the last answer when the last question is selected
+            if selected_index == len(answers) - 1:
+                self.answer_text.yview_moveto(1.0)  # Scroll to the bottom
+
 
-    
     def scroll_to_highlight(self):
         if self.is_recording:
             self.question_text.yview_moveto(1)
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+
+class VoiceActivityDetector:
+    """Frame-level voice activity detector with an adaptive noise floor and onset/hangover smoothing.
+
+    Audio is processed in blocks; each block is split into `frame_size`-sample frames whose
+    energy and zero-crossing rate are computed in a single NumPy pass. `process` returns the
+    speech start/end events found in the block, timestamped in seconds of audio processed.
+    """
+
+    def __init__(self, rate, channels, frame_size, threshold, onset_duration=0.05, hangover_duration=0.25,
+                 noise_ratio=3.0, noise_adapt=0.05, noise_rise=0.001, max_zero_crossing_rate=0.4):
+        self.rate = rate
+        self.channels = channels
+        self.frame_size = frame_size
+        self.frame_duration = frame_size / rate
+        self.threshold = threshold  # Absolute energy floor below which nothing counts as speech
+        self.onset_frames = max(1, round(onset_duration / self.frame_duration))
+        self.hangover_frames = max(1, round(hangover_duration / self.frame_duration))
+        self.noise_ratio = noise_ratio
+        self.noise_adapt = noise_adapt
+        self.noise_rise = noise_rise
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.reset()
+
+
+    def reset(self):
+        self.noise_floor = None
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.frames_processed = 0
+        self.remainder = np.zeros(0, dtype=np.int16)
+
+
+    @property
+    def time(self):
+        """Seconds of audio processed so far."""
+        return self.frames_processed * self.frame_duration
+
+
+    def frame_features(self, samples):
+        """Return per-frame RMS energy and zero-crossing rate for complete frames of interleaved int16 samples."""
+        frames = samples.reshape(-1, self.frame_size, self.channels).astype(np.float32).mean(axis=2)
+        energy = np.sqrt(np.mean(np.square(frames), axis=1))
+        signs = np.signbit(frames)
+        zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        return energy, zero_crossing_rate
+
+
+    def classify(self, energy, zero_crossing_rate):
+        """Label frames as speech against the current noise floor, then adapt the floor."""
+        if self.noise_floor is None:
+            self.noise_floor = float(np.min(energy))
+
+        speech = (energy > max(self.noise_floor * self.noise_ratio, self.threshold)) & \
+                 (zero_crossing_rate < self.max_zero_crossing_rate)
+
+        noise = energy[~speech]
+        if noise.size:
+            weight = 1.0 - (1.0 - self.noise_adapt) ** noise.size
+            self.noise_floor += weight * (float(np.mean(noise)) - self.noise_floor)
+        # Let the floor creep up through sustained "speech" so a new constant noise source is eventually learned,
+        # but never above the quietest frame seen in this block
+        self.noise_floor = min(self.noise_floor * (1.0 + self.noise_rise) ** int(speech.sum()), float(np.min(energy)))
+        return speech
+
+
+    def process(self, audio_data):
+        """Run detection over a block of PCM audio and return a list of ("start" | "end", seconds) events."""
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        if self.remainder.size:
+            samples = np.concatenate((self.remainder, samples))
+        frame_samples = self.frame_size * self.channels
+        usable = samples.size - samples.size % frame_samples
+        self.remainder = samples[usable:].copy()
+        if usable == 0:
+            return []
+
+        speech = self.classify(*self.frame_features(samples[:usable]))
+
+        events = []
+        for i, is_speech in enumerate(speech):
+            if is_speech:
+                self.speech_run += 1
+                self.silence_run = 0
+                if not self.in_speech and self.speech_run >= self.onset_frames:
+                    self.in_speech = True
+                    events.append(("start", (self.frames_processed + i + 1 - self.onset_frames) * self.frame_duration))
+            else:
+                self.speech_run = 0
+                if self.in_speech:
+                    self.silence_run += 1
+                    if self.silence_run >= self.hangover_frames:
+                        self.in_speech = False
+                        events.append(("end", (self.frames_processed + i + 1 - self.hangover_frames) * self.frame_duration))
+        self.frames_processed += len(speech)
+        return events